@@ -1,24 +1,84 @@
+import os
 import csv
 import time
 import numpy as np
-from copy import deepcopy
-from src.data_loader import load_graph 
-from src.main import load_config, run_optimization_instance
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from src.graph_cache import get_graphs
+from src.main import load_config, run_optimization_instance, get_pool_context
+
+_worker_graphs = {}
+_worker_optimizers = {}
+
+def _init_worker(G_directed, G_undirected):
+    """
+    Her işçi süreç için graf nesnelerini bir kez yerleştirir; böylece graf
+    her görevde yeniden serileştirilmez ('fork' bağlamında hiç
+    serileştirilmez).
+    """
+    _worker_graphs['directed'] = G_directed
+    _worker_graphs['undirected'] = G_undirected
+
+def _run_single_experiment(base_config: dict, params: dict, run_index: int, seed: np.random.SeedSequence):
+    """
+    Parametre ızgarasındaki tek bir ayarı, kendisine ayrılmış rastgele sayı
+    akışıyla (seed) bir kez çalıştırır ve CSV satırını döndürür.
+    Başarısız veya geçersiz bir çalıştırmada None döndürür.
+    """
+    # Yalnızca 'aco' ve 'aco.mmas' değiştirildiği için tüm yapılandırmayı
+    # derin kopyalamak yerine bu iki seviye kopyalanır; diğerleri paylaşılır.
+    current_config = {
+        **base_config,
+        'aco': {**base_config['aco'], 'mmas': {**base_config['aco'].get('mmas', {})}}
+    }
+
+    current_config['aco']['strategy'] = params['strategy']
+    current_config['aco']['seed'] = seed
+    if params['strategy'] == 'eas':
+        current_config['aco']['elitism_factor'] = params['elitism_factor']
+    elif params['strategy'] == 'mmas':
+        current_config['aco']['mmas']['rho'] = params['rho']
+
+    # Senaryo tabanlı problemlerde aynı işçideki çalıştırmalar ACOptimizer'ı
+    # (ve ön-hesaplanmış matrislerini) paylaşır; yalnızca feromonlar sıfırlanır.
+    results = run_optimization_instance(
+        current_config,
+        _worker_graphs['directed'],
+        _worker_graphs['undirected'],
+        optimizer_cache=_worker_optimizers
+    )
+
+    if results is None:
+        return None
+
+    best_solution, best_cost, cost_history, elapsed_time, nodes_info_used, start_node_used = results
+
+    if best_cost is None or best_cost == float('inf'):
+        return None
+
+    return {
+        'strategy': params.get('strategy', 'N/A'),
+        'elitism_factor': params.get('elitism_factor', 'N/A'),
+        'rho': params.get('rho', 'N/A'),
+        'run': run_index + 1,
+        'best_cost_km': best_cost / 1000,
+        'time_seconds': elapsed_time
+    }
 
 def run_experiments():
     """
     Grafiği sadece bir kez yükleyerek, farklı parametre kombinasyonlarını
     sistematik olarak test eder ve sonuçları bir CSV dosyasına kaydeder.
+    Çalıştırmalar birbirinden bağımsız olduğundan bir süreç havuzunda paralel yürütülür.
     """
     base_config = load_config()
-    
+
     place_name = base_config['location']['place_name']
     print(f"\nAna Deney için '{place_name}' yol ağı yükleniyor...")
-    G_directed = load_graph(place_name, undirected=False, verbose=True)
-    if G_directed is None:
+    graphs = get_graphs(place_name)
+    if graphs is None:
         print("Graf yüklenemedi, deneyler iptal edildi.")
         return
-    G_undirected = G_directed.to_undirected()
+    G_directed, G_undirected = graphs
     print("Yol ağı deneye hazır.")
 
     parameter_grid = [
@@ -32,63 +92,68 @@ def run_experiments():
 
     num_runs_per_setting = 5
 
+    tasks = [
+        (setting_index, run_index)
+        for setting_index in range(len(parameter_grid))
+        for run_index in range(num_runs_per_setting)
+    ]
+    # Her çalıştırma, ana tohumdan türetilen bağımsız bir akış kullanır; aynı
+    # aco.seed ile deney tekrarlanabilir, akışlar ise birbiriyle ilişkisizdir.
+    task_seeds = np.random.SeedSequence(base_config['aco'].get('seed')).spawn(len(tasks))
+    max_workers = min(len(tasks), os.cpu_count() or 1)
+
     timestamp = time.strftime("%Y%m%d-%H%M%S")
     results_filename = f"experiment_results_{timestamp}.csv"
-    
+
+    rows_per_setting = {setting_index: [] for setting_index in range(len(parameter_grid))}
+    pending_per_setting = {setting_index: num_runs_per_setting for setting_index in range(len(parameter_grid))}
+
     with open(results_filename, 'w', newline='') as csvfile:
         fieldnames = ['strategy', 'elitism_factor', 'rho', 'run', 'best_cost_km', 'time_seconds']
         writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
         writer.writeheader()
 
-        for params in parameter_grid:
-            print(f"\n--- Yeni Deney Başlıyor: {params} ---")
-            
-            costs = []
-            times = []
-
-            for i in range(num_runs_per_setting):
-                print(f"  -> Çalıştırma {i+1}/{num_runs_per_setting}...")
-                
-                current_config = deepcopy(base_config)
-                
-                current_config['aco']['strategy'] = params['strategy']
-                if params['strategy'] == 'eas':
-                    current_config['aco']['elitism_factor'] = params['elitism_factor']
-                elif params['strategy'] == 'mmas':
-                    current_config['aco']['mmas']['rho'] = params['rho']
-                
-                results = run_optimization_instance(
-                    current_config, 
-                    G_directed, 
-                    G_undirected
-                )
-
-                if results is None:
-                    print("  -> Bu çalıştırma başarısız oldu, atlanıyor.")
-                    continue
-
-                best_solution, best_cost, cost_history, elapsed_time, nodes_info_used, start_node_used = results
-
-                if best_cost is not None and best_cost != float('inf'):
-                    costs.append(best_cost / 1000)
-                    times.append(elapsed_time)
-                    
-                    row = {
-                        'strategy': params.get('strategy', 'N/A'),
-                        'elitism_factor': params.get('elitism_factor', 'N/A'),
-                        'rho': params.get('rho', 'N/A'),
-                        'run': i + 1,
-                        'best_cost_km': best_cost / 1000,
-                        'time_seconds': elapsed_time
-                    }
-                    writer.writerow(row)
-
-            if costs:
-                avg_cost = np.mean(costs)
-                std_cost = np.std(costs)
-                print(f"  -> ÖZET: Ortalama Maliyet = {avg_cost:.2f} km, Std. Sapma = {std_cost:.2f} km")
+        print(f"\n{len(tasks)} çalıştırma {max_workers} süreç üzerinde başlatılıyor...")
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=get_pool_context(),
+            initializer=_init_worker,
+            initargs=(G_directed, G_undirected)
+        ) as executor:
+            futures = {
+                executor.submit(
+                    _run_single_experiment, base_config, parameter_grid[setting_index], run_index, seed
+                ): (setting_index, run_index)
+                for (setting_index, run_index), seed in zip(tasks, task_seeds)
+            }
+
+            for future in as_completed(futures):
+                setting_index, run_index = futures[future]
+                params = parameter_grid[setting_index]
+                row = future.result()
+                pending_per_setting[setting_index] -= 1
+
+                if row is None:
+                    print(f"  -> {params} / Çalıştırma {run_index+1} başarısız oldu, atlanıyor.")
+                else:
+                    print(f"  -> {params} / Çalıştırma {run_index+1}/{num_runs_per_setting} tamamlandı.")
+                    rows_per_setting[setting_index].append(row)
+
+                # Satırlar ayar bazında toplu yazılır; bir ayarın tüm çalıştırmaları
+                # bittiğinde dosyaya aktarılır, böylece çökme durumunda tamamlanan
+                # ayarlar kaybolmaz.
+                if pending_per_setting[setting_index] == 0:
+                    writer.writerows(rows_per_setting[setting_index])
+                    csvfile.flush()
+
+    for setting_index, params in enumerate(parameter_grid):
+        costs = [row['best_cost_km'] for row in rows_per_setting[setting_index]]
+        if costs:
+            avg_cost = np.mean(costs)
+            std_cost = np.std(costs)
+            print(f"  -> ÖZET {params}: Ortalama Maliyet = {avg_cost:.2f} km, Std. Sapma = {std_cost:.2f} km")
 
     print(f"\nTüm deneyler tamamlandı. Sonuçlar '{results_filename}' dosyasına kaydedildi.")
 
 if __name__ == "__main__":
-    run_experiments()
\ No newline at end of file
+    run_experiments()
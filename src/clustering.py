@@ -0,0 +1,106 @@
+import numpy as np
+from numba import njit
+
+@njit(cache=True)
+def _grid_cells(coords, eps):
+    """
+    Assigns every point to a square cell of side `eps` and returns the cell
+    coordinates, the number of cell rows, the point indices ordered by cell key
+    and the sorted keys themselves (a CSR-like cell -> points index).
+    """
+    n = coords.shape[0]
+    xmin = coords[:, 0].min()
+    ymin = coords[:, 1].min()
+    cx = np.empty(n, dtype=np.int64)
+    cy = np.empty(n, dtype=np.int64)
+    for i in range(n):
+        cx[i] = np.int64(np.floor((coords[i, 0] - xmin) / eps))
+        cy[i] = np.int64(np.floor((coords[i, 1] - ymin) / eps))
+    num_rows = cy.max() + 1
+    keys = cx * num_rows + cy
+    order = np.argsort(keys, kind='mergesort')
+    return cx, cy, num_rows, order, keys[order]
+
+@njit(cache=True)
+def dbscan_grid(coords, eps, min_samples):
+    """
+    DBSCAN for 2D points in a metric (projected) coordinate system.
+
+    Points are bucketed into a uniform grid with cell size `eps`, so the
+    eps-neighborhood of a point is found by scanning only the 3x3 block of
+    cells around it. Cells are kept as a sorted key array and looked up with a
+    binary search, so memory stays O(n) however large the bounding box is.
+
+    Follows sklearn's DBSCAN semantics: a point is a core point if at least
+    `min_samples` points (itself included) lie within distance `eps`, and
+    clusters are numbered in the order of their first core point. Returns an
+    int64 label array with -1 for noise.
+    """
+    n = coords.shape[0]
+    labels = np.full(n, -1, dtype=np.int64)
+    if n == 0:
+        return labels
+
+    cx, cy, num_rows, order, sorted_keys = _grid_cells(coords, eps)
+    num_cols = cx.max() + 1
+    eps_squared = eps * eps
+
+    is_core = np.zeros(n, dtype=np.bool_)
+    for i in range(n):
+        count = 0
+        for dx in range(-1, 2):
+            x = cx[i] + dx
+            if x < 0 or x >= num_cols:
+                continue
+            for dy in range(-1, 2):
+                y = cy[i] + dy
+                if y < 0 or y >= num_rows:
+                    continue
+                key = x * num_rows + y
+                start = np.searchsorted(sorted_keys, key, side='left')
+                end = np.searchsorted(sorted_keys, key, side='right')
+                for s in range(start, end):
+                    j = order[s]
+                    ddx = coords[i, 0] - coords[j, 0]
+                    ddy = coords[i, 1] - coords[j, 1]
+                    if ddx * ddx + ddy * ddy <= eps_squared:
+                        count += 1
+        is_core[i] = count >= min_samples
+
+    # Each point is labeled when first reached and pushed only if it is a
+    # core point, so the stack never holds more than n entries.
+    stack = np.empty(n, dtype=np.int64)
+    label = 0
+    for i in range(n):
+        if labels[i] != -1 or not is_core[i]:
+            continue
+        labels[i] = label
+        stack[0] = i
+        top = 1
+        while top > 0:
+            top -= 1
+            p = stack[top]
+            for dx in range(-1, 2):
+                x = cx[p] + dx
+                if x < 0 or x >= num_cols:
+                    continue
+                for dy in range(-1, 2):
+                    y = cy[p] + dy
+                    if y < 0 or y >= num_rows:
+                        continue
+                    key = x * num_rows + y
+                    start = np.searchsorted(sorted_keys, key, side='left')
+                    end = np.searchsorted(sorted_keys, key, side='right')
+                    for s in range(start, end):
+                        q = order[s]
+                        if labels[q] != -1:
+                            continue
+                        ddx = coords[p, 0] - coords[q, 0]
+                        ddy = coords[p, 1] - coords[q, 1]
+                        if ddx * ddx + ddy * ddy <= eps_squared:
+                            labels[q] = label
+                            if is_core[q]:
+                                stack[top] = q
+                                top += 1
+        label += 1
+    return labels
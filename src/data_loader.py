@@ -1,11 +1,35 @@
+import os
+import re
+import pickle
 import osmnx as ox
 import networkx as nx
 from typing import Optional
 
-def load_graph(place_name: str, network_type: str = 'drive', undirected: bool = True, verbose: bool = True) -> Optional[nx.MultiDiGraph]:
+DEFAULT_GRAPH_CACHE_DIR = "data/cache/graphs"
+
+ox.settings.use_cache = True
+ox.settings.cache_folder = "data/cache/osmnx"
+ox.settings.log_console = False
+
+def _graph_cache_path(place_name: str, network_type: str, cache_dir: str) -> str:
+    """Yer adı ve ağ türünden dosya sistemi için güvenli bir önbellek dosya yolu üretir."""
+    slug = re.sub(r'[^\w]+', '_', place_name, flags=re.UNICODE).strip('_').lower()
+    return os.path.join(cache_dir, f"{slug}_{network_type}.pkl")
+
+def load_graph(
+    place_name: str,
+    network_type: str = 'drive',
+    undirected: bool = True,
+    verbose: bool = True,
+    cache_dir: Optional[str] = DEFAULT_GRAPH_CACHE_DIR
+) -> Optional[nx.MultiDiGraph]:
     """
     Belirtilen yer için OSMnx kullanarak bir yol ağı grafiği indirir ve hazırlar.
 
+    İndirilen (yönlü) graf `cache_dir` altında pickle olarak saklanır; sonraki
+    çağrılar ve işçi süreçler grafiği yeniden indirip ayrıştırmak yerine bu
+    dosyadan yükler. OSMnx'in HTTP önbelleği de açıktır.
+
     Args:
         place_name (str): İndirilecek yerin adı (örn. 'Çorlu, Tekirdağ, Türkiye').
         network_type (str, optional): Çekilecek ağ türü. Varsayılan: 'drive'.
@@ -13,16 +37,29 @@ def load_graph(place_name: str, network_type: str = 'drive', undirected: bool =
                                      ACO için genellikle True olması tercih edilir. Varsayılan: True.
         verbose (bool, optional): İşlem sırasında bilgi mesajları yazdırılıp yazdırılmayacağı. 
                                   Varsayılan: True.
+        cache_dir (Optional[str], optional): Pickle önbelleğinin klasörü. None ise önbellek
+                                             kullanılmaz. Varsayılan: 'data/cache/graphs'.
 
     Returns:
         Optional[nx.MultiDiGraph]: Başarılı olursa OSMnx graf nesnesini, 
                                    aksi takdirde None döndürür.
     """
     try:
-        if verbose:
-            print(f"'{place_name}' için '{network_type}' yol ağı indiriliyor...")
-        
-        graph = ox.graph_from_place(place_name, network_type=network_type)
+        cache_path = _graph_cache_path(place_name, network_type, cache_dir) if cache_dir else None
+
+        if cache_path and os.path.exists(cache_path):
+            if verbose:
+                print(f"'{place_name}' yol ağı önbellekten yükleniyor: '{cache_path}'")
+            with open(cache_path, 'rb') as f:
+                graph = pickle.load(f)
+        else:
+            if verbose:
+                print(f"'{place_name}' için '{network_type}' yol ağı indiriliyor...")
+            graph = ox.graph_from_place(place_name, network_type=network_type)
+            if cache_path:
+                os.makedirs(cache_dir, exist_ok=True)
+                with open(cache_path, 'wb') as f:
+                    pickle.dump(graph, f, protocol=pickle.HIGHEST_PROTOCOL)
         
         if undirected:
             graph = graph.to_undirected()
@@ -36,4 +73,55 @@ def load_graph(place_name: str, network_type: str = 'drive', undirected: bool =
 
     except Exception as e:
         print(f"Graf yüklenirken bir hata oluştu: {e}")
-        return None
\ No newline at end of file
+        return None
+
+def to_simple_undirected(graph: nx.MultiDiGraph, weight: str = 'length') -> nx.Graph:
+    """
+    Çoklu/yönlü bir yol ağını, her düğüm çifti için yalnızca en kısa kenarı
+    tutan basit ve yönsüz bir `nx.Graph`'a dönüştürür. Düğüm öznitelikleri
+    (koordinatlar) korunur; kenarlarda sadece `weight` özniteliği taşınır.
+
+    `to_undirected()`'ın aksine paralel kenarları ve tüm kenar verilerini
+    kopyalamadığı için hem daha hafiftir hem de üzerinde yapılan en kısa yol
+    hesaplamaları çoklu graf yükü taşımaz.
+    """
+    shortest: dict = {}
+    for u, v, length in graph.edges(data=weight, default=float('inf')):
+        key = (u, v) if u <= v else (v, u)
+        if key not in shortest or length < shortest[key]:
+            shortest[key] = length
+
+    simple = nx.Graph()
+    simple.graph.update(graph.graph)
+    simple.add_nodes_from(graph.nodes(data=True))
+    simple.add_weighted_edges_from(((u, v, length) for (u, v), length in shortest.items()), weight=weight)
+    return simple
+
+def load_simple_undirected(
+    graph: nx.MultiDiGraph,
+    place_name: str,
+    network_type: str = 'drive',
+    cache_dir: Optional[str] = DEFAULT_GRAPH_CACHE_DIR
+) -> nx.Graph:
+    """
+    `to_simple_undirected` sonucunu `cache_dir` altında pickle olarak saklar ve
+    yönlü graf önbelleğinden daha yeni olduğu sürece dönüşümü tekrarlamadan
+    oradan yükler. `cache_dir` None ise her seferinde dönüştürür.
+    """
+    if not cache_dir:
+        return to_simple_undirected(graph)
+
+    source_path = _graph_cache_path(place_name, network_type, cache_dir)
+    cache_path = source_path[:-len('.pkl')] + '.undirected.pkl'
+
+    if os.path.exists(cache_path) and (
+        not os.path.exists(source_path) or os.path.getmtime(cache_path) >= os.path.getmtime(source_path)
+    ):
+        with open(cache_path, 'rb') as f:
+            return pickle.load(f)
+
+    simple = to_simple_undirected(graph)
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(cache_path, 'wb') as f:
+        pickle.dump(simple, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return simple
@@ -0,0 +1,25 @@
+import functools
+import networkx as nx
+from typing import Optional, Tuple
+
+from src.data_loader import load_graph, load_simple_undirected
+
+@functools.lru_cache(maxsize=4)
+def _load_graphs(place_name: str) -> Tuple[nx.MultiDiGraph, nx.Graph]:
+    G_directed = load_graph(place_name, undirected=False, verbose=False)
+    if G_directed is None:
+        # lru_cache istisnaları önbelleğe almaz; başarısız yükleme sonra tekrar denenebilir.
+        raise LookupError(place_name)
+    return G_directed, load_simple_undirected(G_directed, place_name)
+
+def get_graphs(place_name: str) -> Optional[Tuple[nx.MultiDiGraph, nx.Graph]]:
+    """
+    Belirtilen yer için (yönlü graf, basit yönsüz graf) çiftini döndürür.
+    Aynı süreçteki tekrar çağrılar yükleme ve dönüşümü yinelemez; disk
+    önbellekleriyle birlikte soğuk başlangıç tek bir okuma, sıcak başlangıç
+    ise maliyetsizdir. Graf yüklenemezse None döndürür.
+    """
+    try:
+        return _load_graphs(place_name)
+    except LookupError:
+        return None
@@ -1,28 +1,100 @@
-import logging
 import os
 import sys
 import yaml
-import random
 import time
 import json
 import argparse
+import tempfile
+import multiprocessing
+from typing import List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 import networkx as nx
 import numpy as np
-from sklearn.cluster import DBSCAN
+from pyproj import Transformer
 
-from src.data_loader import load_graph
-from src.optimization import ACOptimizer
+# orjson kuruluysa senaryo dosyaları C tabanlı ayrıştırıcıyla okunur; yoksa standart json kullanılır.
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+# libyaml varsa YAML, saf Python ayrıştırıcısı yerine C tabanlı yükleyiciyle okunur.
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+from src.graph_cache import get_graphs
+from src.clustering import dbscan_grid
+from src.optimization import ACOConfig, ACOptimizer, build_node_arrays
 from src.visualization.map_plotter import plot_optimized_route, plot_convergence
-from src.utils import update_config_with_args
+from src.utils import OSRMDistanceProvider, update_config_with_args
+
+# Ortalama dünya yarıçapında bir derecelik büyük daire yayının uzunluğu (metre).
+_METERS_PER_DEGREE = 111_195.0
+
+def project_to_utm(coords: np.ndarray) -> np.ndarray:
+    """
+    (boylam, enlem) derece koordinatlarını, noktaların ortasına düşen UTM
+    dilimine (WGS 84) izdüşürür ve metre cinsinden (x, y) dizisi döndürür.
+    """
+    lon0, lat0 = np.median(coords[:, 0]), np.median(coords[:, 1])
+    zone = int((lon0 + 180) // 6) % 60 + 1
+    epsg = (32600 if lat0 >= 0 else 32700) + zone
+    transformer = Transformer.from_crs("EPSG:4326", f"EPSG:{epsg}", always_xy=True)
+    x, y = transformer.transform(coords[:, 0], coords[:, 1])
+    return np.column_stack((x, y))
+
+def _config_signature(config_path: str) -> List[int]:
+    """YAML dosyasının önbellek anahtarı: nanosaniye çözünürlüklü mtime ve boyut."""
+    stat = os.stat(config_path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+def _write_config_cache(cache_path: str, signature: List[int], config: dict) -> None:
+    """
+    Ayrıştırılmış yapılandırmayı, kaynağın imzasıyla birlikte JSON önbelleğine
+    atomik olarak yazar. JSON'a birebir dönüşmeyen yapılandırmalar (örn. metin
+    olmayan anahtarlar) önbelleğe alınmaz; yazılamazsa (örn. salt okunur
+    klasör) sessizce vazgeçilir.
+    """
+    tmp_name = None
+    try:
+        if json.loads(json.dumps(config)) != config:
+            return
+        with tempfile.NamedTemporaryFile('w', dir=os.path.dirname(os.path.abspath(cache_path)), suffix='.tmp', delete=False) as tmp:
+            tmp_name = tmp.name
+            json.dump({'signature': signature, 'config': config}, tmp)
+        os.replace(tmp_name, cache_path)
+    except (OSError, TypeError, ValueError):
+        if tmp_name is not None:
+            os.remove(tmp_name)
 
 def load_config(config_path: str = 'config.yaml') -> dict:
     """
     Loads the YAML configuration file.
+
+    Ayrıştırılmış yapılandırma '<config_path>.json' olarak önbelleğe alınır.
+    Önbellek, YAML dosyasının (st_mtime_ns, st_size) imzasını saklar ve yalnızca
+    imza aynıysa YAML yerine çok daha hızlı olan JSON okunur; zaman damgası
+    karşılaştırmasının aksine aynı saat adımında yapılan düzenlemeler kaçmaz.
     """
     print(f"'{config_path}' adresinden yapılandırma yükleniyor...")
+    cache_path = config_path + '.json'
     try:
+        signature = _config_signature(config_path)
+        if os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'r') as f:
+                    cached = json.load(f)
+                if isinstance(cached, dict) and cached.get('signature') == signature:
+                    print("Yapılandırma önbellekten yüklendi.")
+                    return cached['config']
+            except (OSError, json.JSONDecodeError, KeyError):
+                pass
+
         with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
+            config = yaml.load(f, Loader=_YamlLoader)
+        _write_config_cache(cache_path, signature, config)
         print("Yapılandırma başarıyla yüklendi.")
         return config
     except FileNotFoundError:
@@ -42,12 +114,14 @@ def parse_arguments():
     parser.add_argument('--scenario', type=str, help="'from_scenario' stratejisi için senaryo dosyasının yolu.")
     parser.add_argument('--iterations', type=int, help="Optimizasyon iterasyon sayısı.")
     parser.add_argument('--output', type=str, help="Sonuç haritasının kaydedileceği dosya adı.")
+    parser.add_argument('--runs', type=int, default=1, help="Paralel çalıştırılacak bağımsız koloni sayısı; en iyi sonuç tutulur.")
     return parser.parse_args()
 
-def run_optimization_instance(config: dict, G_directed: nx.MultiDiGraph, G_undirected: nx.Graph):
+def build_problem(config: dict, G_undirected: nx.Graph) -> Optional[Tuple[dict, int]]:
     """
-    Tek bir optimizasyon örneğini, önceden yüklenmiş graf nesneleri ve 
-    verilen konfigürasyonla çalıştırır.
+    Konfigürasyondaki stratejiye göre ziyaret edilecek durakları, taleplerini
+    ve zaman pencerelerini belirler. Başarılı olursa (nodes_info, depo düğümü),
+    aksi takdirde None döndürür.
     """
     print("\nProblem tanımlanıyor (duraklar ve talepler seçiliyor)...")
     problem_config = config['problem']
@@ -62,10 +136,10 @@ def run_optimization_instance(config: dict, G_directed: nx.MultiDiGraph, G_undir
         scenario_path = problem_config.get('scenario_filepath')
         if not scenario_path:
             print("HATA: Strateji 'from_scenario' olarak ayarlanmış ancak 'scenario_filepath' belirtilmemiş.")
-            return None, None, None, None
+            return None
         try:
-            with open(scenario_path, 'r') as f:
-                scenario = json.load(f)
+            with open(scenario_path, 'rb') as f:
+                scenario = json_loads(f.read())
                 
                 depot_node = scenario['depot_node_id']
                 for node_data in scenario['nodes']:
@@ -80,7 +154,7 @@ def run_optimization_instance(config: dict, G_directed: nx.MultiDiGraph, G_undir
             print(f"'{scenario_path}' senaryosundan 1 depo ve {len(scenario['nodes'])} durak/talep yüklendi.")
         except Exception as e:
             print(f"HATA: Senaryo dosyası '{scenario_path}' okunurken hata oluştu: {e}")
-            return None, None, None, None
+            return None
             
     elif strategy == "random" or strategy == "dbscan":
         random_params = problem_config.get('random_stops', {})
@@ -94,55 +168,87 @@ def run_optimization_instance(config: dict, G_directed: nx.MultiDiGraph, G_undir
         max_duration = tw_config.get('max_duration_minutes', 180)  # 3 saat
 
         selected_nodes = []
+        rng = np.random.default_rng(problem_config.get('seed'))
 
         if strategy == "random":
             num_stops = random_params.get('num_stops', 10)
-            all_nodes = list(G_undirected.nodes())
-            if len(all_nodes) < num_stops:
+            num_nodes = G_undirected.number_of_nodes()
+            if num_nodes < num_stops:
                 print(f"HATA: Graf yeterli sayıda düğüm içermiyor.")
-                return None, None, None, None
-            selected_nodes = random.sample(all_nodes, num_stops)
+                return None
+            # Örnekleme NumPy üreteciyle indeksler üzerinde yapılır; sıralama önemli
+            # olmadığından iç karıştırma (shuffle) atlanır.
+            all_nodes = np.fromiter(G_undirected.nodes(), dtype=np.int64, count=num_nodes)
+            idx = rng.choice(num_nodes, size=num_stops, replace=False, shuffle=False)
+            selected_nodes = all_nodes[idx].tolist()
             print(f"Optimizasyon için {num_stops} adet rastgele durak ve talep oluşturuldu.")
 
         elif strategy == "dbscan":
             dbscan_params = problem_config.get('dbscan', {})
-            eps = dbscan_params.get('eps', 0.01)
+            eps_meters = dbscan_params.get('eps_meters')
+            if eps_meters is None:
+                # Eski 'eps' ayarı derece cinsinden yaydır; metreye çevrilir.
+                eps_meters = dbscan_params.get('eps', 0.01) * _METERS_PER_DEGREE
             min_samples = dbscan_params.get('min_samples', 5)
-            nodes_data = G_undirected.nodes(data=True)
-            coords = np.array([[data['x'], data['y']] for _, data in nodes_data])
-            node_ids = np.array([node_id for node_id, _ in nodes_data])
-            db = DBSCAN(eps=eps, min_samples=min_samples).fit(coords)
-            labels = db.labels_
-            unique_labels = set(labels)
-            if -1 in unique_labels: unique_labels.remove(-1)
-
-            if not unique_labels:
+            # Koordinatlar ve düğüm ID'leri tek geçişte, önceden ayrılmış dizilere yazılır.
+            num_nodes = G_undirected.number_of_nodes()
+            coords = np.empty((num_nodes, 2), dtype=np.float64)
+            node_ids = np.empty(num_nodes, dtype=np.int64)
+            for i, (node_id, data) in enumerate(G_undirected.nodes(data=True)):
+                coords[i, 0] = data['x']
+                coords[i, 1] = data['y']
+                node_ids[i] = node_id
+            # Koordinatlar bir kez yerel UTM dilimine (metre) izdüşürülür; böylece
+            # mesafeler izotropik olur ve Öklid metriği kullanılabilir. Kümeleme,
+            # eps boyutlu hücrelere bölünmüş bir ızgarada yalnızca komşu 3x3
+            # hücreler taranarak yapılır (src/clustering.py).
+            xy = project_to_utm(coords)
+            labels = dbscan_grid(xy, float(eps_meters), min_samples)
+
+            # Etiketler tek bir kararlı sıralamayla kümelere ayrılır; her küme için
+            # tüm etiket dizisini yeniden taramak (np.where) gerekmez.
+            order = np.argsort(labels, kind='stable')
+            sorted_labels = labels[order]
+            boundaries = np.flatnonzero(np.diff(sorted_labels)) + 1
+            clusters = [
+                group for group, label in zip(np.split(order, boundaries), sorted_labels[np.r_[0, boundaries]])
+                if label != -1
+            ]
+
+            if not clusters:
                  print("HATA: DBSCAN hiçbir küme bulamadı.")
-                 return None, None, None, None
-            for label in unique_labels:
-                cluster_indices = np.where(labels == label)[0]
-                random_index = random.choice(cluster_indices)
-                selected_nodes.append(int(node_ids[random_index]))
+                 return None
+            # Her kümeden birer rastgele üye tek bir vektörel çekilişle seçilir.
+            cluster_sizes = np.fromiter((len(c) for c in clusters), dtype=np.int64, count=len(clusters))
+            offsets = rng.integers(0, cluster_sizes)
+            picks = [cluster_indices[offset] for cluster_indices, offset in zip(clusters, offsets)]
+            selected_nodes = node_ids[picks].tolist()
             print(f"DBSCAN ile {len(selected_nodes)} küme/durak bulundu.")
 
-        for node_id in selected_nodes:
-            start_time = random.randint(earliest_start, latest_start)
-            duration = random.randint(min_duration, max_duration)
-            end_time = start_time + duration
-            
-            nodes_info[node_id] = {
-                'demand': random.randint(min_demand, max_demand),
+        # Talepler ve zaman pencereleri tüm duraklar için tek seferde üretilir.
+        num_selected = len(selected_nodes)
+        start_times = rng.integers(earliest_start, latest_start + 1, num_selected)
+        end_times = start_times + rng.integers(min_duration, max_duration + 1, num_selected)
+        demands = rng.integers(min_demand, max_demand + 1, num_selected)
+
+        nodes_info = {
+            node_id: {
+                'demand': demand,
                 'time_window': [start_time, end_time],
                 'service_time': default_service_time
             }
+            for node_id, demand, start_time, end_time in zip(
+                selected_nodes, demands.tolist(), start_times.tolist(), end_times.tolist()
+            )
+        }
         
     else:
         print(f"HATA: Geçersiz problem stratejisi: '{strategy}'.")
-        return None, None, None, None
+        return None
 
     if not nodes_info:
         print("HATA: Ziyaret edilecek hiçbir durak bulunamadı.")
-        return None, None, None, None
+        return None
         
     start_node = depot_node if depot_node is not None else list(nodes_info.keys())[0]
     if depot_node is None:
@@ -150,38 +256,164 @@ def run_optimization_instance(config: dict, G_directed: nx.MultiDiGraph, G_undir
         nodes_info[start_node]['time_window'] = [0, 1440]
         nodes_info[start_node]['service_time'] = 0
     
+    return nodes_info, start_node
+
+def solve_problem(
+    config: dict,
+    G_undirected: nx.Graph,
+    nodes_info: dict,
+    start_node: int,
+    optimizer_cache: Optional[dict] = None
+) -> Tuple[List[List[int]], float, List[float], float]:
+    """
+    Belirlenmiş bir problem için ACO optimizasyonunu çalıştırır ve
+    (en iyi çözüm, en iyi maliyet, maliyet geçmişi, geçen süre) döndürür.
+
+    `optimizer_cache` verilirse ve problem deterministikse ('from_scenario'),
+    aynı senaryo için oluşturulan ACOptimizer saklanır ve sonraki çağrılarda
+    matrisler yeniden hesaplanmadan yalnızca feromonları sıfırlanarak kullanılır.
+    """
+    problem_config = config['problem']
+    strategy = problem_config.get('strategy', 'random')
+
     print("\nOptimizasyon süreci başlıyor...")
     start_time = time.time()
 
-    aco_params = config['aco']
+    aco_config = ACOConfig.from_dict(config['aco'])
     osrm_config = config.get('osrm', {})
     osrm_host = osrm_config.get('host', 'http://127.0.0.1:5000')
-    aco_strategy = aco_params.get('strategy', 'eas')
-    mmas_params = aco_params.get('mmas', {})
     
-    optimizer = ACOptimizer(
-        graph=G_undirected,
-        nodes_info=nodes_info,
-        start_node=start_node,
-        vehicle_fleet=aco_params['vehicle_fleet'],
-        osrm_host=osrm_host,
-        aco_strategy=aco_strategy,
-        vehicle_fixed_cost=aco_params.get('vehicle_fixed_cost', 0.0),
-        alpha=aco_params['alpha'],
-        beta=aco_params['beta'],
-        evaporation_rate=aco_params.get('evaporation_rate', 0.5),
-        eas_elitism_factor=aco_params.get('elitism_factor', 1.0),
-        mmas_rho=mmas_params.get('rho', 0.2)
-    )
+    cache_key = problem_config.get('scenario_filepath') if strategy == "from_scenario" else None
+    optimizer = optimizer_cache.get(cache_key) if optimizer_cache is not None and cache_key else None
+
+    if optimizer is not None:
+        optimizer.reset_pheromones(
+            aco_strategy=aco_config.strategy,
+            alpha=aco_config.alpha,
+            evaporation_rate=aco_config.evaporation_rate,
+            eas_elitism_factor=aco_config.elitism_factor,
+            mmas_rho=aco_config.mmas_rho,
+            seed=aco_config.seed
+        )
+    else:
+        optimizer = ACOptimizer.from_config(
+            G_undirected, nodes_info, start_node, osrm_host, aco_config,
+            node_arrays=build_node_arrays(nodes_info)
+        )
+        if optimizer_cache is not None and cache_key:
+            optimizer_cache[cache_key] = optimizer
     
-    best_solution, best_cost, cost_history = optimizer.run(aco_params['iterations'])
+    best_solution, best_cost, cost_history = optimizer.run(aco_config.iterations)
     end_time = time.time()
     elapsed_time = end_time - start_time
     
     print(f"Optimizasyon tamamlandı! Toplam süre: {elapsed_time:.2f} saniye, Maliyet: {best_cost/1000 if best_cost != float('inf') else 'N/A'} km")
 
+    return best_solution, best_cost, cost_history, elapsed_time
+
+def run_optimization_instance(config: dict, G_directed: nx.MultiDiGraph, G_undirected: nx.Graph, optimizer_cache: Optional[dict] = None):
+    """
+    Tek bir optimizasyon örneğini, önceden yüklenmiş graf nesneleri ve 
+    verilen konfigürasyonla çalıştırır. Problem oluşturulamazsa None döndürür.
+    """
+    problem = build_problem(config, G_undirected)
+    if problem is None:
+        return None
+    nodes_info, start_node = problem
+
+    best_solution, best_cost, cost_history, elapsed_time = solve_problem(
+        config, G_undirected, nodes_info, start_node, optimizer_cache=optimizer_cache
+    )
+    return best_solution, best_cost, cost_history, elapsed_time, nodes_info, start_node
+
+_worker_graphs = {}
+
+def get_pool_context():
+    """
+    Süreç havuzları için başlatma bağlamını döndürür. Destekleyen platformlarda
+    (Linux) 'fork' seçilir: işçiler ana süreçte yüklenmiş grafı kopyala-yaz (COW)
+    sayfalarıyla devralır, graf hiç serileştirilmez. Diğer platformlarda varsayılan
+    bağlam kullanılır ve graf başlatıcı argümanı olarak bir kez gönderilir.
+    """
+    if sys.platform != 'darwin' and 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context()
+
+def _init_run_worker(G_undirected: nx.Graph):
+    """Paralel çalıştırma işçisine grafı bir kez yerleştirir; görevler grafı taşımaz."""
+    _worker_graphs['undirected'] = G_undirected
+
+def _single_run(config: dict, nodes_info: dict, start_node: int, seed: np.random.SeedSequence):
+    """Aynı problemi kendi rastgele sayı akışıyla, bağımsız bir koloni olarak çözer."""
+    run_config = {**config, 'aco': {**config['aco'], 'seed': seed}}
+    return solve_problem(run_config, _worker_graphs['undirected'], nodes_info, start_node)
+
+def run_parallel_instances(config: dict, G_directed: nx.MultiDiGraph, G_undirected: nx.Graph, runs: int):
+    """
+    Aynı problemi `runs` adet bağımsız koloniyle bir süreç havuzunda çözer ve
+    en düşük maliyetli sonucu `run_optimization_instance` ile aynı biçimde döndürür.
+    Problem (duraklar ve talepler) ve seyahat matrisleri ana süreçte yalnızca
+    bir kez oluşturulur.
+    """
+    problem = build_problem(config, G_undirected)
+    if problem is None:
+        return None
+    nodes_info, start_node = problem
+
+    # Seyahat matrisleri ana süreçte bir kez çözülür ve diske önbelleğe alınır;
+    # böylece işçiler aynı OSRM /table sorgularını eşzamanlı göndermez, her biri
+    # tamamlanmış önbellek dosyasını okur.
+    osrm_host = config.get('osrm', {}).get('host', 'http://127.0.0.1:5000')
+    OSRMDistanceProvider(G_undirected, host=osrm_host).get_travel_matrices(list(nodes_info))
+
+    # Her koloni, ana tohumdan SeedSequence.spawn ile türetilen bağımsız bir akış
+    # kullanır; ardışık tohumların (base + i) aksine akışlar birbiriyle ilişkisizdir.
+    # Tohum verilmemişse ana dizi işletim sisteminin entropisinden oluşturulur.
+    seeds = np.random.SeedSequence(config['aco'].get('seed')).spawn(runs)
+    max_workers = min(runs, os.cpu_count() or 1)
+
+    print(f"\n{runs} bağımsız koloni {max_workers} süreç üzerinde çalıştırılıyor...")
+    start_time = time.time()
+    best = None
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=get_pool_context(),
+        initializer=_init_run_worker,
+        initargs=(G_undirected,)
+    ) as executor:
+        futures = [executor.submit(_single_run, config, nodes_info, start_node, seed) for seed in seeds]
+        for future in as_completed(futures):
+            result = future.result()
+            if best is None or result[1] < best[1]:
+                best = result
+    elapsed_time = time.time() - start_time
+
+    best_solution, best_cost, cost_history, _ = best
     return best_solution, best_cost, cost_history, elapsed_time, nodes_info, start_node
 
+def save_route_map(
+    G_directed: nx.MultiDiGraph,
+    best_solution: List[List[int]],
+    nodes_info: dict,
+    start_node: int,
+    output_filename: str
+):
+    """Çözümün rota haritasını oluşturur ve `output_filename` adresine kaydeder."""
+    demand_info_for_plotting = {node_id: info['demand'] for node_id, info in nodes_info.items()}
+    route_map = plot_optimized_route(
+        graph=G_directed,
+        best_solution=best_solution,
+        nodes_to_visit=list(nodes_info.keys()),
+        start_node=start_node,
+        nodes_info=demand_info_for_plotting
+    )
+
+    if route_map:
+        route_map.save(output_filename)
+        print(f"Harita başarıyla '{os.path.abspath(output_filename)}' adresine kaydedildi.")
+    else:
+        print("Harita oluşturulamadı.")
+
 def main():
     """
     Komut satırından çalıştırıldığında ana programı yönetir.
@@ -192,14 +424,18 @@ def main():
 
     place_name = config['location']['place_name']
     print(f"\n'{place_name}' için yol ağı indiriliyor (bu işlem önbelleğe alınmış olabilir)...")
-    G_directed = load_graph(place_name, undirected=False, verbose=False)
-    if G_directed is None:
+    graphs = get_graphs(place_name)
+    if graphs is None:
         print("Graf yüklenemedi, program sonlandırılıyor.")
         return
-    G_undirected = G_directed.to_undirected()
+    G_directed, G_undirected = graphs
     print("Yol ağı başarıyla indirildi ve hazırlandı.")
 
-    results = run_optimization_instance(config, G_directed, G_undirected)
+    runs = getattr(args, 'runs', 1) or 1
+    if runs > 1:
+        results = run_parallel_instances(config, G_directed, G_undirected, runs)
+    else:
+        results = run_optimization_instance(config, G_directed, G_undirected)
     if results is None:
         print("Optimizasyon çalıştırılamadı.")
         return
@@ -213,28 +449,19 @@ def main():
         
         print("\nSonuç haritası ve grafiği oluşturuluyor...")
                 
-        nodes_to_visit = list(nodes_info_used.keys())
-        
-        demand_info_for_plotting = {node_id: info['demand'] for node_id, info in nodes_info_used.items()}
-
         output_filename = config['output']['map_filename']
-        route_map = plot_optimized_route(
-            graph=G_directed,
-            best_solution=best_solution,
-            nodes_to_visit=nodes_to_visit,
-            start_node=start_node_used,
-            nodes_info=demand_info_for_plotting
-        )
-        
-        if route_map:
-            route_map.save(output_filename)
-            print(f"Harita başarıyla '{os.path.abspath(output_filename)}' adresine kaydedildi.")
-        else:
-            print("Harita oluşturulamadı.")
-
         base_filename, _ = os.path.splitext(output_filename)
         convergence_filename = f"{base_filename}_convergence.png"
-        plot_convergence(cost_history, convergence_filename)
+
+        # Harita ve yakınsama grafiği birbirinden bağımsızdır; arka plan
+        # iş parçacıklarında eşzamanlı oluşturulur.
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            map_future = executor.submit(
+                save_route_map, G_directed, best_solution, nodes_info_used, start_node_used, output_filename
+            )
+            convergence_future = executor.submit(plot_convergence, cost_history, convergence_filename)
+            map_future.result()
+            convergence_future.result()
     else:
         print("Optimizasyon bir sonuç üretemedi.")
 
@@ -1,2 +1,3 @@
 from .ant import Ant
-from .optimizer import ACOptimizer
\ No newline at end of file
+from .aco_config import ACOConfig
+from .optimizer import ACOptimizer, build_node_arrays
\ No newline at end of file
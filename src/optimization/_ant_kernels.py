@@ -0,0 +1,166 @@
+import numpy as np
+from numba import njit
+
+@njit(cache=True, nogil=True)
+def _power(x, p):
+    """
+    x ** p in float64, with the default exponents (alpha = 1, beta = 2) as a
+    plain read or multiply instead of a call to pow. The multiply is correctly
+    rounded, so it can differ from pow only in the last bit.
+    """
+    x = np.float64(x)
+    if p == 1.0:
+        return x
+    if p == 2.0:
+        return x * x
+    return x ** p
+
+@njit(cache=True, nogil=True)
+def _candidate_weight(
+    current_node, current_time, current_load, capacity, k,
+    pheromones, time_matrix, heuristic_base, eta_beta,
+    demands, tw_open, tw_close, alpha, beta
+):
+    """Selection weight tau^alpha * eta^beta of node k, or -1.0 if k is infeasible."""
+    if current_load + demands[k] > capacity:
+        return -1.0
+    arrival_time = current_time + time_matrix[current_node, k]
+    if arrival_time > tw_close[k]:
+        return -1.0
+    wait_time = tw_open[k] - arrival_time
+    if wait_time > 0.0:
+        eta = _power(1.0 / (heuristic_base[current_node, k] + wait_time), beta)
+    else:
+        eta = eta_beta[current_node, k]
+    return _power(pheromones[current_node, k], alpha) * eta
+
+@njit(cache=True, nogil=True)
+def select_next_node(
+    current_node, current_time, current_load, capacity,
+    pheromones, time_matrix, heuristic_base, eta_beta,
+    demands, tw_open, tw_close, candidate_mask, neighbors,
+    alpha, beta, candidates, cumulative, rng
+):
+    """
+    Roulette-wheel selection of the next node among the feasible candidates.
+    Feasibility filtering and scoring are done in a single pass; sampling uses a
+    running cumulative sum and a binary search. Returns -1 if nothing is feasible.
+
+    `heuristic_base` holds the static part of the heuristic denominator
+    (distance + travel time + urgency) and `eta_beta` its precomputed
+    `heuristic_base ** -beta`; the power is only evaluated here for candidates
+    that would incur a waiting time.
+
+    `neighbors` is the (n, k) nearest-neighbor candidate list: only those k
+    nodes are scored, and all n nodes are scanned only if none of them is
+    feasible. With k == 0 every step is a full scan.
+
+    `candidates` (int64) and `cumulative` (float64) are caller-owned scratch
+    buffers of length n, reused across calls so that no step allocates.
+    `rng` is the caller's np.random.Generator, so every colony (and worker)
+    draws from its own explicitly seeded stream.
+    """
+    num_candidates = 0
+    total = 0.0
+
+    for j in range(neighbors.shape[1]):
+        k = neighbors[current_node, j]
+        if not candidate_mask[k]:
+            continue
+        weight = _candidate_weight(
+            current_node, current_time, current_load, capacity, k,
+            pheromones, time_matrix, heuristic_base, eta_beta,
+            demands, tw_open, tw_close, alpha, beta
+        )
+        if weight < 0.0:
+            continue
+        total += weight
+        candidates[num_candidates] = k
+        cumulative[num_candidates] = total
+        num_candidates += 1
+
+    if num_candidates == 0:
+        for k in range(demands.shape[0]):
+            if not candidate_mask[k]:
+                continue
+            weight = _candidate_weight(
+                current_node, current_time, current_load, capacity, k,
+                pheromones, time_matrix, heuristic_base, eta_beta,
+                demands, tw_open, tw_close, alpha, beta
+            )
+            if weight < 0.0:
+                continue
+            total += weight
+            candidates[num_candidates] = k
+            cumulative[num_candidates] = total
+            num_candidates += 1
+
+    if num_candidates == 0:
+        return -1
+    if total == 0.0:
+        return candidates[int(rng.random() * num_candidates)]
+
+    threshold = rng.random() * total
+    return candidates[np.searchsorted(cumulative[:num_candidates], threshold, side='right')]
+
+@njit(cache=True, nogil=True)
+def construct_tour(
+    start_node, capacity,
+    pheromones, dist_matrix, time_matrix, heuristic_base, eta_beta,
+    demands, tw_open, tw_close, service_times,
+    unvisited_mask, neighbors, alpha, beta, tour, candidates, cumulative, rng
+):
+    """
+    Builds one vehicle tour from the depot and back, visiting nodes until no
+    feasible candidate remains. Visited nodes are cleared from `unvisited_mask`
+    in place so that the next vehicle of the colony skips them.
+
+    The problem size n is fixed for a whole run, so the caller allocates the
+    scratch buffers once and reuses them for every tour: `tour` (int64, n + 1),
+    `candidates` (int64, n) and `cumulative` (float64, n).
+
+    Returns (tour, total_distance, current_time, current_load, total_wait_time,
+    time_window_violated). `tour` is a view into the `tour` buffer and is just
+    [start_node] if nothing was visited; it is overwritten by the next call.
+    """
+    tour[0] = start_node
+    length = 1
+
+    current_node = start_node
+    current_time = 0.0
+    current_load = 0.0
+    total_distance = 0.0
+    total_wait_time = 0.0
+    time_window_violated = False
+
+    while True:
+        next_node = select_next_node(
+            current_node, current_time, current_load, capacity,
+            pheromones, time_matrix, heuristic_base, eta_beta,
+            demands, tw_open, tw_close, unvisited_mask, neighbors,
+            alpha, beta, candidates, cumulative, rng
+        )
+        if next_node < 0:
+            break
+
+        arrival_time = current_time + time_matrix[current_node, next_node]
+        if arrival_time > tw_close[next_node]:
+            time_window_violated = True
+        wait_time = max(0.0, tw_open[next_node] - arrival_time)
+        total_wait_time += wait_time
+        current_time = arrival_time + wait_time + service_times[next_node]
+
+        current_load += demands[next_node]
+        total_distance += dist_matrix[current_node, next_node]
+        unvisited_mask[next_node] = False
+        tour[length] = next_node
+        length += 1
+        current_node = next_node
+
+    if current_node != start_node:
+        total_distance += dist_matrix[current_node, start_node]
+        current_time += time_matrix[current_node, start_node]
+        tour[length] = start_node
+        length += 1
+
+    return tour[:length], total_distance, current_time, current_load, total_wait_time, time_window_violated
@@ -0,0 +1,39 @@
+import numpy as np
+from numba import njit
+
+@njit(cache=True, nogil=True)
+def evaporate_and_deposit(pheromones, rho, tour_nodes, tour_offsets, tour_amounts, tau_min, tau_max):
+    """
+    Evaporates, deposits and clamps the pheromone matrix in place.
+
+    The matrix is walked once: every entry is scaled by (1 - rho) and clamped
+    to [tau_min, tau_max] in the same pass. Deposits are then added edge by edge
+    and clamped from above, which is all that is needed since they only raise
+    values. Both directions of an edge get the same value, so a symmetric
+    matrix stays symmetric.
+
+    Tours are given flattened: tour t is tour_nodes[tour_offsets[t]:tour_offsets[t + 1]]
+    and deposits tour_amounts[t] on each of its edges. Pass tau_min=0 and
+    tau_max=inf for no clamping (EAS).
+    """
+    keep = 1.0 - rho
+    n = pheromones.shape[0]
+    for i in range(n):
+        for j in range(n):
+            value = pheromones[i, j] * keep
+            if value < tau_min:
+                value = tau_min
+            elif value > tau_max:
+                value = tau_max
+            pheromones[i, j] = value
+
+    for t in range(tour_offsets.shape[0] - 1):
+        amount = tour_amounts[t]
+        for s in range(tour_offsets[t], tour_offsets[t + 1] - 1):
+            u = tour_nodes[s]
+            v = tour_nodes[s + 1]
+            value = pheromones[u, v] + amount
+            if value > tau_max:
+                value = tau_max
+            pheromones[u, v] = value
+            pheromones[v, u] = value
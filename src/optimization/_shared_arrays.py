@@ -0,0 +1,51 @@
+import numpy as np
+from multiprocessing import shared_memory, resource_tracker
+from typing import Dict, List, Tuple
+
+ArraySpec = Tuple[str, Tuple[int, ...], str]
+
+def to_shared(array: np.ndarray) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    """Copies `array` into a new shared memory block and returns the block and a NumPy view on it."""
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    view[...] = array
+    return shm, view
+
+def spec_of(shm: shared_memory.SharedMemory, array: np.ndarray) -> ArraySpec:
+    """Describes a shared array by block name, shape and dtype so it can be sent to workers instead of the data."""
+    return shm.name, array.shape, array.dtype.str
+
+def release(blocks: List[shared_memory.SharedMemory]):
+    """Closes and unlinks blocks created by `to_shared`. Views on them must already be dropped."""
+    for shm in blocks:
+        shm.close()
+        shm.unlink()
+
+_attached_blocks: Dict[str, shared_memory.SharedMemory] = {}
+_attached_views: Dict[str, np.ndarray] = {}
+
+def attach_all(specs: Dict[str, ArraySpec]) -> Dict[str, np.ndarray]:
+    """
+    Worker side: returns NumPy views on the shared blocks described by `specs`.
+    Blocks are attached once per worker and reused while the parent keeps
+    sending the same set; a new set (the next run) replaces the old one.
+    """
+    names = {spec[0] for spec in specs.values()}
+    if names != set(_attached_blocks):
+        _attached_views.clear()
+        for shm in _attached_blocks.values():
+            try:
+                shm.close()
+            except BufferError:
+                pass
+        _attached_blocks.clear()
+
+        for key, (name, shape, dtype) in specs.items():
+            shm = shared_memory.SharedMemory(name=name)
+            # The creating process owns the block; keep this worker's tracker
+            # from unlinking it when the worker exits.
+            resource_tracker.unregister(shm._name, 'shared_memory')
+            _attached_blocks[name] = shm
+            _attached_views[key] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+    return dict(_attached_views)
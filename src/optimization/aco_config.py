@@ -0,0 +1,49 @@
+import numpy as np
+from dataclasses import dataclass
+from typing import Optional, Tuple, Union
+
+@dataclass(frozen=True, slots=True)
+class ACOConfig:
+    """
+    Yapılandırmanın 'aco' bölümünün tipli, değiştirilemez hali. Varsayılan
+    değerler yalnızca burada tanımlanır; sözlük bir kez `from_dict` ile
+    ayrıştırılır ve ardından alanlara doğrudan erişilir.
+    """
+    vehicle_fleet: Tuple[int, ...]
+    iterations: int
+    strategy: str = "eas"
+    alpha: float = 1.0
+    beta: float = 2.0
+    evaporation_rate: float = 0.5
+    elitism_factor: float = 1.0
+    mmas_rho: float = 0.2
+    vehicle_fixed_cost: float = 0.0
+    colony_size: int = 1
+    n_jobs: int = 1
+    parallel_backend: str = "processes"
+    seed: Optional[Union[int, np.random.SeedSequence]] = None
+    candidate_list_size: int = 0
+    stagnation_limit: int = 0
+
+    @classmethod
+    def from_dict(cls, aco_params: dict) -> "ACOConfig":
+        """`config['aco']` sözlüğünden, eksik anahtarlar için varsayılanlarla bir ACOConfig oluşturur."""
+        defaults = cls(vehicle_fleet=(), iterations=0)
+        mmas_params = aco_params.get('mmas') or {}
+        return cls(
+            vehicle_fleet=tuple(aco_params['vehicle_fleet']),
+            iterations=aco_params['iterations'],
+            strategy=aco_params.get('strategy', defaults.strategy),
+            alpha=aco_params.get('alpha', defaults.alpha),
+            beta=aco_params.get('beta', defaults.beta),
+            evaporation_rate=aco_params.get('evaporation_rate', defaults.evaporation_rate),
+            elitism_factor=aco_params.get('elitism_factor', defaults.elitism_factor),
+            mmas_rho=mmas_params.get('rho', defaults.mmas_rho),
+            vehicle_fixed_cost=aco_params.get('vehicle_fixed_cost', defaults.vehicle_fixed_cost),
+            colony_size=aco_params.get('colony_size', defaults.colony_size),
+            n_jobs=aco_params.get('n_jobs', defaults.n_jobs),
+            parallel_backend=aco_params.get('parallel_backend', defaults.parallel_backend),
+            seed=aco_params.get('seed', defaults.seed),
+            candidate_list_size=aco_params.get('candidate_list_size', defaults.candidate_list_size),
+            stagnation_limit=aco_params.get('stagnation_limit', defaults.stagnation_limit),
+        )
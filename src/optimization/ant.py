@@ -1,28 +1,91 @@
-import random
-from typing import List, Dict, Set, Tuple, Any, Optional
-from ..utils import OSRMDistanceProvider
-import networkx as nx
+import numpy as np
+from typing import List, Tuple, Optional
+from . import _ant_kernels
 
-Graph = nx.MultiDiGraph
+def build_heuristic_tables(
+    dist_matrix: np.ndarray,
+    time_matrix: np.ndarray,
+    tw_close: np.ndarray,
+    beta: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Precomputes the static part of the selection heuristic
+    1 / (distance + travel time + wait + urgency). Everything except the wait
+    term is fixed for a run, so both the denominator and its power `-beta`
+    are computed once here instead of per candidate. The tables are computed
+    in float64 and stored in the precision of `dist_matrix`.
+    """
+    heuristic_base = dist_matrix + time_matrix + tw_close[np.newaxis, :] + 1e-10
+    eta_beta = (1.0 / heuristic_base) ** beta
+    return heuristic_base.astype(dist_matrix.dtype, copy=False), eta_beta.astype(dist_matrix.dtype, copy=False)
+
+def build_candidate_lists(dist_matrix: np.ndarray, size: int) -> np.ndarray:
+    """
+    Returns the (n, k) nearest-neighbor candidate list: row i holds the indices
+    of the k closest other nodes to i, nearest first. k is clipped to n - 1;
+    a size of 0 gives an empty list, which disables candidate lists.
+    """
+    n = dist_matrix.shape[0]
+    k = max(0, min(size, n - 1))
+    if k == 0:
+        return np.empty((n, 0), dtype=np.int64)
+    distances = dist_matrix.copy()
+    np.fill_diagonal(distances, np.inf)
+    nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    order = np.argsort(np.take_along_axis(distances, nearest, axis=1), axis=1, kind='stable')
+    return np.ascontiguousarray(np.take_along_axis(nearest, order, axis=1), dtype=np.int64)
 
 class Ant:
     """
     Represents a single vehicle (or ant) in a CVRP or VRPTW problem.
     It builds a series of tours respecting capacity and time window constraints.
+
+    Nodes are addressed by compact indices into the precomputed distance
+    (meters) and travel time (minutes) matrices and the per-node demand and
+    time window arrays. `heuristic_base` and `eta_beta` are the static heuristic
+    tables built by `build_heuristic_tables` for the beta used in selection.
+    `neighbors` is an optional nearest-neighbor list from `build_candidate_lists`.
+    Random draws come from `rng`, normally the optimizer's generator.
     """
-    def __init__(self, graph: Graph, start_node: int, capacity: int, distance_provider: OSRMDistanceProvider):
-        self.graph = graph
+    def __init__(
+        self,
+        start_node: int,
+        capacity: int,
+        dist_matrix: np.ndarray,
+        time_matrix: np.ndarray,
+        demands: np.ndarray,
+        tw_open: np.ndarray,
+        tw_close: np.ndarray,
+        service_times: np.ndarray,
+        heuristic_base: np.ndarray,
+        eta_beta: np.ndarray,
+        neighbors: Optional[np.ndarray] = None,
+        rng: Optional[np.random.Generator] = None
+    ):
         self.start_node = start_node
         self.capacity = capacity
-        self.distance_provider = distance_provider
+        self.dist_matrix = dist_matrix
+        self.time_matrix = time_matrix
+        self.demands = demands
+        self.tw_open = tw_open
+        self.tw_close = tw_close
+        self.service_times = service_times
+        self.heuristic_base = heuristic_base
+        self.eta_beta = eta_beta
+        self.neighbors = neighbors if neighbors is not None else np.empty((len(demands), 0), dtype=np.int64)
+        self.rng = rng if rng is not None else np.random.default_rng()
         self.tours: List[List[int]] = []
         self.total_distance: float = 0.0
         self.current_tour: List[int] = []
         self.current_load: int = 0
-        self.visited_nodes: Set[int] = set()
+        self.visited_mask: np.ndarray = np.zeros(len(demands), dtype=bool)
         self.current_time: float = 0.0
         self.total_wait_time: float = 0.0
         self.time_window_violated: bool = False
+        self._tour = np.empty(len(demands) + 1, dtype=np.int64)
+        self._candidates = np.empty(len(demands), dtype=np.int64)
+        self._cumulative = np.empty(len(demands), dtype=np.float64)
+        self._candidate_mask = np.empty(len(demands), dtype=bool)
         self.reset()
 
     def reset(self):
@@ -31,55 +94,65 @@ class Ant:
         self.total_distance = 0.0
         self.current_tour = [self.start_node]
         self.current_load = 0
-        self.visited_nodes = {self.start_node}
+        self.visited_mask.fill(False)
+        self.visited_mask[self.start_node] = True
         self.current_time = 0.0
         self.total_wait_time = 0.0
         self.time_window_violated = False
 
-    def _select_next_node(self, pheromones: Dict, all_nodes_info: Dict[int, Any], alpha: float, beta: float) -> Optional[int]:
+    def _select_next_node(self, pheromones: np.ndarray, unvisited_mask: np.ndarray, alpha: float, beta: float) -> Optional[int]:
         """
-        Selects the next node to visit. Returns None if no valid node can be visited.
+        Selects the next node to visit among the nodes flagged in `unvisited_mask`.
+        Returns None if no valid node can be visited.
         """
-        current_node = self.current_tour[-1]
-        candidate_nodes = []
-        for node_id, info in all_nodes_info.items():
-            if node_id not in self.visited_nodes:
-                if self.current_load + info['demand'] > self.capacity:
-                    continue
-                _, travel_time = self.distance_provider.get_travel_info(current_node, node_id)
-                arrival_time = self.current_time + travel_time
-                if arrival_time > info['time_window'][1]:
-                    continue
-                candidate_nodes.append(node_id)
-        
-        if not candidate_nodes:
-            return None
-
-        probabilities = []
-        for next_node in candidate_nodes:
-            edge = tuple(sorted((current_node, next_node)))
-            pheromone = pheromones.get(edge, 1.0)
-            distance, travel_time = self.distance_provider.get_travel_info(current_node, next_node)
-            arrival_time = self.current_time + travel_time
-            wait_time = max(0, all_nodes_info[next_node]['time_window'][0] - arrival_time)
-            urgency = all_nodes_info[next_node]['time_window'][1]
-            heuristic = 1.0 / (distance + travel_time + wait_time + urgency + 1e-10)
-            probabilities.append((pheromone ** alpha) * (heuristic ** beta))
+        # For booleans, a > b is a & ~b: one pass into a reused buffer, no temporaries.
+        np.greater(unvisited_mask, self.visited_mask, out=self._candidate_mask)
+        next_node = _ant_kernels.select_next_node(
+            self.current_tour[-1], self.current_time, self.current_load, self.capacity,
+            pheromones, self.time_matrix, self.heuristic_base, self.eta_beta,
+            self.demands, self.tw_open, self.tw_close, self._candidate_mask, self.neighbors,
+            alpha, beta, self._candidates, self._cumulative, self.rng
+        )
+        return None if next_node < 0 else int(next_node)
 
-        total_prob = sum(probabilities)
-        if total_prob == 0:
-            return random.choice(candidate_nodes) if candidate_nodes else None
-            
-        normalized_probs = [p / total_prob for p in probabilities]
-        return random.choices(candidate_nodes, weights=normalized_probs, k=1)[0]
+    def construct_tour(self, pheromones: np.ndarray, unvisited_mask: np.ndarray, alpha: float, beta: float):
+        """
+        Resets the ant and builds its complete tour in a single compiled call,
+        equivalent to stepping _select_next_node / move_to_node until no node is
+        feasible and then calling finalize_solution. Nodes taken by this ant are
+        cleared from `unvisited_mask` in place.
+        """
+        self.reset()
+        (
+            tour,
+            self.total_distance,
+            self.current_time,
+            self.current_load,
+            self.total_wait_time,
+            self.time_window_violated,
+        ) = _ant_kernels.construct_tour(
+            self.start_node, self.capacity,
+            pheromones, self.dist_matrix, self.time_matrix, self.heuristic_base, self.eta_beta,
+            self.demands, self.tw_open, self.tw_close, self.service_times,
+            unvisited_mask, self.neighbors, alpha, beta,
+            self._tour, self._candidates, self._cumulative, self.rng
+        )
+        self.visited_mask[tour] = True
+        if len(tour) > 1:
+            self.current_tour = tour.tolist()
+            self.tours.append(self.current_tour)
 
-    def move_to_node(self, next_node: int, all_nodes_info: Dict[int, Any]):
+    def move_to_node(self, next_node: int):
         """
         Moves the ant to the next node, updating its state including current time
-        and considering service time at the node.
+        and considering service time at the node. Node data is read positionally
+        from the SoA arrays. Matrix and array entries are read as Python floats
+        so that totals accumulate in double precision even when the matrices are
+        stored as float32.
         """
         last_node = self.current_tour[-1]
-        distance_traveled, time_traveled = self.distance_provider.get_travel_info(last_node, next_node)
+        distance_traveled = float(self.dist_matrix[last_node, next_node])
+        time_traveled = float(self.time_matrix[last_node, next_node])
 
         arrival_time = self.current_time + time_traveled
 
@@ -91,24 +164,18 @@ class Ant:
             self.current_tour = [self.start_node]
             self.current_load = 0
         else:
-            node_info = all_nodes_info[next_node]
-            
-            earliest_arrival = node_info['time_window'][0]
-            latest_arrival = node_info['time_window'][1]
-
-            if arrival_time > latest_arrival:
+            if arrival_time > self.tw_close[next_node]:
                 self.time_window_violated = True
             
-            wait_time = max(0, earliest_arrival - arrival_time)
+            wait_time = max(0.0, float(self.tw_open[next_node]) - arrival_time)
             self.total_wait_time += wait_time
 
             service_start_time = arrival_time + wait_time
-            service_time = node_info.get('service_time', 0)
-            self.current_time = service_start_time + service_time
+            self.current_time = service_start_time + float(self.service_times[next_node])
 
             self.current_tour.append(next_node)
-            self.visited_nodes.add(next_node)
-            self.current_load += node_info['demand']
+            self.visited_mask[next_node] = True
+            self.current_load += float(self.demands[next_node])
             self.total_distance += distance_traveled
 
     def finalize_solution(self):
@@ -116,7 +183,8 @@ class Ant:
         Ensures the last tour is properly finished by returning to the depot.
         """
         if self.current_tour and self.current_tour[-1] != self.start_node:
-            distance_to_depot, time_to_depot = self.distance_provider.get_travel_info(self.current_tour[-1], self.start_node)
+            distance_to_depot = float(self.dist_matrix[self.current_tour[-1], self.start_node])
+            time_to_depot = float(self.time_matrix[self.current_tour[-1], self.start_node])
             self.current_tour.append(self.start_node)
             self.tours.append(self.current_tour)
             self.total_distance += distance_to_depot
@@ -1,15 +1,109 @@
 import logging
+import numpy as np
 import networkx as nx
+from joblib import Parallel, delayed
 from tqdm import tqdm
-from typing import List, Tuple, Dict, Set
+from typing import List, Tuple, Dict, Optional, Union
 
-from .ant import Ant
+from .ant import Ant, build_heuristic_tables, build_candidate_lists
+from ._pheromone_kernels import evaporate_and_deposit
+from .aco_config import ACOConfig
+from . import _shared_arrays
 from ..utils import OSRMDistanceProvider
 
 Graph = nx.MultiDiGraph
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+ColonySolution = Tuple[List[List[int]], float, float, bool, int]
+NodeArrays = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+FlatTours = Tuple[np.ndarray, np.ndarray]
+
+def build_node_arrays(nodes_info: Dict[int, dict]) -> NodeArrays:
+    """
+    Durak sözlüğünü (nodes_info) sıkıştırılmış indeks sırasına göre dizi yapısına
+    (SoA) dönüştürür: talepler, zaman penceresi başlangıç/bitişleri ve hizmet süreleri.
+    i. eleman, nodes_info'daki i. düğüme karşılık gelir. Her dizi ara liste
+    oluşturmadan tek geçişte doldurulur.
+    """
+    n = len(nodes_info)
+    infos = nodes_info.values()
+    demands = np.fromiter((info['demand'] for info in infos), dtype=np.float64, count=n)
+    tw_open = np.fromiter((info['time_window'][0] for info in infos), dtype=np.float64, count=n)
+    tw_close = np.fromiter((info['time_window'][1] for info in infos), dtype=np.float64, count=n)
+    service_times = np.fromiter((info.get('service_time', 0) for info in infos), dtype=np.float64, count=n)
+    return demands, tw_open, tw_close, service_times
+
+def construct_colony_solution(
+    ants: List[Ant],
+    pheromones: np.ndarray,
+    num_nodes: int,
+    alpha: float,
+    beta: float
+) -> ColonySolution:
+    """
+    Filodaki karıncaların (araçların) ortak bir çözümü sırayla, işbirliği içinde
+    oluşturmasını sağlar. Her araç yalnızca kendisinden önceki araçların
+    ziyaret etmediği duraklar arasından seçim yapar.
+
+    Sadece NumPy dizileri ve hafif Ant nesneleriyle çalıştığı için (graf veya
+    OSRM istemcisi taşımaz) işçi süreçlere ucuza gönderilebilir.
+
+    Returns:
+        ColonySolution: (turlar, toplam mesafe, toplam bekleme süresi,
+                         zaman penceresi ihlali, ziyaret edilemeyen durak sayısı)
+    """
+    tours: List[List[int]] = []
+    total_distance = 0.0
+    total_wait_time = 0.0
+    time_window_violated = False
+
+    unvisited_mask = np.ones(num_nodes, dtype=bool)
+    unvisited_mask[ants[0].start_node] = False
+
+    for ant in ants:
+        if not unvisited_mask.any():
+            break
+
+        ant.construct_tour(pheromones, unvisited_mask, alpha, beta)
+
+        tours.extend(ant.tours)
+        total_distance += ant.total_distance
+        total_wait_time += ant.total_wait_time
+        if ant.time_window_violated:
+            time_window_violated = True
+
+    return tours, total_distance, total_wait_time, time_window_violated, int(np.count_nonzero(unvisited_mask))
+
+_SHARED_ARRAY_NAMES = (
+    'pheromones', 'dist_matrix', 'time_matrix', 'heuristic_base', 'eta_beta',
+    'demands', 'tw_open', 'tw_close', 'service_times', 'neighbors'
+)
+
+def construct_colony_solution_shared(
+    specs: Dict[str, _shared_arrays.ArraySpec],
+    start_idx: int,
+    vehicle_fleet: List[int],
+    alpha: float,
+    beta: float,
+    rng: np.random.Generator
+) -> ColonySolution:
+    """
+    İşçi süreçte çalışan `construct_colony_solution` sürümü. Feromon ve sabit
+    matrisler paylaşımlı bellekten okunur; göreve yalnızca blok adları,
+    boyutlar, araç kapasiteleri ve bu göreve ayrılmış rastgele sayı üreteci gönderilir.
+    """
+    arrays = _shared_arrays.attach_all(specs)
+    ants = [
+        Ant(
+            start_idx, capacity, arrays['dist_matrix'], arrays['time_matrix'],
+            arrays['demands'], arrays['tw_open'], arrays['tw_close'], arrays['service_times'],
+            arrays['heuristic_base'], arrays['eta_beta'], arrays['neighbors'], rng=rng
+        )
+        for capacity in vehicle_fleet
+    ]
+    return construct_colony_solution(ants, arrays['pheromones'], len(arrays['demands']), alpha, beta)
+
 class ACOptimizer:
     """
     Karınca Kolonisi Optimizasyonu (ACO) kullanarak Araç Rotalama Problemini (VRP)
@@ -35,7 +129,14 @@ class ACOptimizer:
         beta: float = 2.0,
         evaporation_rate: float = 0.5,
         eas_elitism_factor: float = 1.0,
-        mmas_rho: float = 0.2
+        mmas_rho: float = 0.2,
+        colony_size: int = 1,
+        n_jobs: int = 1,
+        parallel_backend: str = "processes",
+        seed: Optional[Union[int, np.random.SeedSequence]] = None,
+        candidate_list_size: int = 0,
+        stagnation_limit: int = 0,
+        node_arrays: Optional[NodeArrays] = None
     ):
         """
         ACOptimizer sınıfını başlatır.
@@ -53,6 +154,20 @@ class ACOptimizer:
             evaporation_rate (float): Feromon buharlaşma oranı (EAS için).
             eas_elitism_factor (float): EAS'de global en iyi çözümün feromonunu güçlendirme faktörü.
             mmas_rho (float): MMAS için feromon buharlaşma oranı.
+            colony_size (int): Her iterasyonda bağımsız olarak oluşturulan filo çözümü sayısı.
+            n_jobs (int): Filo çözümlerini paralel oluşturacak işçi sayısı; `parallel_backend`e göre
+                          süreç ya da iş parçacığı sayısıdır (joblib kuralı: -1 tüm çekirdekler,
+                          1 seri çalışma).
+            parallel_backend (str): "processes" (paylaşımlı bellekli süreçler) veya "threads".
+                                    Tur çekirdekleri GIL'i bıraktığından iş parçacıkları
+                                    matris kopyası ya da süreç başlatma maliyeti olmadan ölçeklenir.
+            seed (Optional[Union[int, SeedSequence]]): Rastgele sayı üreteci tohumu; None ise her çalıştırma farklıdır.
+            candidate_list_size (int): Her adımda öncelikle değerlendirilecek en yakın komşu sayısı.
+                                       Bunların hiçbiri uygun değilse tüm duraklar taranır; 0 kapatır.
+            stagnation_limit (int): Global en iyi maliyet bu kadar iterasyon boyunca iyileşmezse
+                                    çalıştırma erken sonlandırılır; 0 kapatır.
+            node_arrays (Optional[NodeArrays]): `build_node_arrays(nodes_info)` ile önceden
+                                                hazırlanmış diziler; verilmezse burada oluşturulur.
         """
         self.graph = graph
         self.nodes_info = nodes_info
@@ -67,52 +182,216 @@ class ACOptimizer:
         self.evaporation_rate = evaporation_rate
         self.eas_elitism_factor = eas_elitism_factor
         self.mmas_rho = mmas_rho
+        self.colony_size = max(1, colony_size)
+        self.n_jobs = n_jobs
+        self.parallel_backend = parallel_backend.lower()
+        self.rng = np.random.default_rng(seed)
+        self.stagnation_limit = max(0, stagnation_limit)
         
         self.pheromone_min = 0.0
         self.pheromone_max = float('inf')
         self.mmas_initialized = False
 
+        self.node_ids: List[int] = list(self.nodes_info.keys())
+        self.node_idx: Dict[int, int] = {node: i for i, node in enumerate(self.node_ids)}
+        self.num_nodes = len(self.node_ids)
+        self.start_idx = self.node_idx[self.start_node]
+        if node_arrays is None:
+            node_arrays = build_node_arrays(self.nodes_info)
+        self.demands, self.tw_open, self.tw_close, self.service_times = node_arrays
+
         self.distance_cache = OSRMDistanceProvider(self.graph, host=self.osrm_host)
+        self.dist_matrix, self.time_matrix = self._precompute_travel_matrices()
+        self.heuristic_base, self.eta_beta = build_heuristic_tables(
+            self.dist_matrix, self.time_matrix, self.tw_close, self.beta
+        )
+        self.neighbors = build_candidate_lists(self.dist_matrix, candidate_list_size)
         self.pheromones = self._init_pheromones()
         
-        self.ants = [Ant(self.graph, self.start_node, capacity, self.distance_cache) for capacity in self.vehicle_fleet]
+        self.ants = self._build_ants(self.rng)
         self.num_ants = len(self.vehicle_fleet)
+        self._thread_ants: List[List[Ant]] = []
 
         self.global_best_solution: List[List[int]] = []
         self.global_best_cost: float = float('inf')
+        # Global en iyi çözüm nadiren değiştiğinden, EAS'in her iterasyondaki elitist
+        # bırakması için düzleştirilmiş hali yalnızca iyileştiğinde yeniden oluşturulur.
+        self._global_best_flat: FlatTours = self._flatten_tours([])
+
+        self._shared_blocks = []
+        self._shared_specs: Dict[str, _shared_arrays.ArraySpec] = {}
+
+    @classmethod
+    def from_config(
+        cls,
+        graph: nx.Graph,
+        nodes_info: Dict[int, dict],
+        start_node: int,
+        osrm_host: str,
+        config: ACOConfig,
+        node_arrays: Optional[NodeArrays] = None
+    ) -> "ACOptimizer":
+        """Tipli bir ACOConfig'ten, parametreleri tek tek aktarmadan bir optimize edici oluşturur."""
+        return cls(
+            graph=graph,
+            nodes_info=nodes_info,
+            start_node=start_node,
+            vehicle_fleet=list(config.vehicle_fleet),
+            osrm_host=osrm_host,
+            aco_strategy=config.strategy,
+            vehicle_fixed_cost=config.vehicle_fixed_cost,
+            alpha=config.alpha,
+            beta=config.beta,
+            evaporation_rate=config.evaporation_rate,
+            eas_elitism_factor=config.elitism_factor,
+            mmas_rho=config.mmas_rho,
+            colony_size=config.colony_size,
+            n_jobs=config.n_jobs,
+            parallel_backend=config.parallel_backend,
+            seed=config.seed,
+            candidate_list_size=config.candidate_list_size,
+            stagnation_limit=config.stagnation_limit,
+            node_arrays=node_arrays
+        )
+
+    def reset_pheromones(
+        self,
+        aco_strategy: Optional[str] = None,
+        alpha: Optional[float] = None,
+        evaporation_rate: Optional[float] = None,
+        eas_elitism_factor: Optional[float] = None,
+        mmas_rho: Optional[float] = None,
+        seed: Optional[Union[int, np.random.SeedSequence]] = None
+    ):
+        """
+        Optimizasyonu aynı problem için yeniden çalıştırmaya hazırlar. Yalnızca
+        feromonlar, MMAS limitleri, global en iyi çözüm ve rastgele sayı üreteci
+        sıfırlanır; mesafe/süre matrisleri ve sezgisel tablolar korunur.
+        Verilen strateji parametreleri (None olmayanlar) güncellenir.
+        """
+        if aco_strategy is not None:
+            self.strategy = aco_strategy.lower()
+        if alpha is not None:
+            self.alpha = alpha
+        if evaporation_rate is not None:
+            self.evaporation_rate = evaporation_rate
+        if eas_elitism_factor is not None:
+            self.eas_elitism_factor = eas_elitism_factor
+        if mmas_rho is not None:
+            self.mmas_rho = mmas_rho
+
+        self.pheromones.fill(1.0)
+        self.pheromone_min = 0.0
+        self.pheromone_max = float('inf')
+        self.mmas_initialized = False
+
+        self.global_best_solution = []
+        self.global_best_cost = float('inf')
+        self._global_best_flat = self._flatten_tours([])
+
+        self.rng = np.random.default_rng(seed)
+        for ant in self.ants:
+            ant.rng = self.rng
+            ant.reset()
+
+    def _build_ants(self, rng: np.random.Generator) -> List[Ant]:
+        """Filodaki her araç için, optimize edicinin dizilerini paylaşan bir karınca oluşturur."""
+        return [
+            Ant(
+                self.start_idx, capacity, self.dist_matrix, self.time_matrix,
+                self.demands, self.tw_open, self.tw_close, self.service_times,
+                self.heuristic_base, self.eta_beta, self.neighbors, rng=rng
+            )
+            for capacity in self.vehicle_fleet
+        ]
+
+    def _precompute_travel_matrices(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Duraklar arasındaki mesafe (metre) ve süre (dakika) matrislerini bir kez hesaplar.
+        Tüm matris, çift başına ayrı /route isteği yerine OSRM /table servisiyle
+        toplu olarak alınır. Matrisler kompakt düğüm indeksleriyle (self.node_idx) adreslenir.
+
+        Matrisler float32 olarak saklanır: rota hesabı için metre/dakika altı
+        hassasiyet gereksizdir ve yarı boyutlu matrisler her karınca adımında
+        okunurken önbellekte iki kat daha fazla yer kaplar. Ulaşılamayan çiftler
+        için inf değeri korunur (int32 bunu taşıyamazdı).
+        """
+        logging.info("Mesafe/süre matrisi ön-hesaplanıyor...")
+        dist_matrix, time_matrix = self.distance_cache.get_travel_matrices(self.node_ids)
+        return dist_matrix.astype(np.float32, copy=False), time_matrix.astype(np.float32, copy=False)
 
-    def _init_pheromones(self) -> Dict[Tuple[int, int], float]:
-        """Tüm kenarlar için başlangıç feromon seviyesini ayarlar."""
-        pheromones = {}
-        all_nodes = list(self.nodes_info.keys())
+    def _init_pheromones(self) -> np.ndarray:
+        """
+        Tüm kenarlar için başlangıç feromon seviyesini ayarlar. Matris, kompakt
+        indekslerle adreslenen yoğun ve simetrik bir float32 dizisidir; seçim
+        sırasında her adımda okunduğundan yarı boyutu önbellekte daha çok yer açar.
+        """
         logging.info("Pheromonlar ön-başlatılıyor...")
-        for i in range(len(all_nodes)):
-            for j in range(i + 1, len(all_nodes)):
-                edge = tuple(sorted((all_nodes[i], all_nodes[j])))
-                pheromones[edge] = 1.0
-        return pheromones
-
-    def _apply_pheromone_deposit(self, tours: List[List[int]], deposit_amount: float):
-        """Verilen turlar üzerine belirtilen miktarda feromon bırakır."""
-        for tour in tours:
-            for i in range(len(tour) - 1):
-                edge = tuple(sorted((tour[i], tour[i+1])))
-                if edge in self.pheromones:
-                    self.pheromones[edge] += deposit_amount
+        n = self.num_nodes
+        return np.ones((n, n), dtype=np.float32)
+
+    def _to_node_ids(self, tours: List[List[int]]) -> List[List[int]]:
+        """Kompakt indekslerle ifade edilen turları orijinal düğüm ID'lerine çevirir."""
+        return [[self.node_ids[i] for i in tour] for tour in tours]
+
+    @staticmethod
+    def _flatten_tours(tours: List[List[int]]) -> FlatTours:
+        """
+        Turları feromon çekirdeğinin beklediği biçime çevirir: tüm düğümleri
+        içeren tek bir int64 dizisi ve her turun bu dizideki başlangıç ofsetleri
+        (son eleman toplam uzunluktur).
+        """
+        offsets = np.zeros(len(tours) + 1, dtype=np.int64)
+        np.cumsum([len(tour) for tour in tours], out=offsets[1:])
+        nodes = np.fromiter(
+            (node for tour in tours for node in tour), dtype=np.int64, count=int(offsets[-1])
+        )
+        return nodes, offsets
+
+    def _evaporate_and_deposit(
+        self,
+        rho: float,
+        deposits: List[Tuple[FlatTours, float]],
+        tau_min: float = 0.0,
+        tau_max: float = float('inf')
+    ):
+        """
+        Feromonları buharlaştırır, verilen (düzleştirilmiş turlar, miktar)
+        çiftlerinin kenar bırakmalarını uygular ve değerleri [tau_min, tau_max]
+        aralığına sıkıştırır.
+
+        Üç adım, matrisi tek geçişte dolaşan derlenmiş bir çekirdekte birleştirilir
+        (`evaporate_and_deposit`). Kenarlar yönsüz olduğundan her bırakma iki yöne
+        de yazılır; seçim sırasında satır erişimi bozulmasın diye matris yoğun ve
+        simetrik tutulur.
+        """
+        node_parts, offset_parts, amount_parts = [], [np.zeros(1, dtype=np.int64)], []
+        num_nodes = 0
+        for (nodes, offsets), deposit_amount in deposits:
+            node_parts.append(nodes)
+            offset_parts.append(offsets[1:] + num_nodes)
+            amount_parts.append(np.full(len(offsets) - 1, deposit_amount))
+            num_nodes += len(nodes)
+
+        nodes = np.concatenate(node_parts) if node_parts else np.empty(0, dtype=np.int64)
+        amounts = np.concatenate(amount_parts) if amount_parts else np.empty(0, dtype=np.float64)
+        evaporate_and_deposit(
+            self.pheromones, rho, nodes, np.concatenate(offset_parts), amounts, tau_min, tau_max
+        )
 
     def _update_pheromones_eas(self, iteration_best_solution: Tuple[List[List[int]], float]):
         """Elitist Ant System (EAS) stratejisine göre feromonları günceller."""
-        for edge in self.pheromones:
-            self.pheromones[edge] *= (1 - self.evaporation_rate)
+        deposits = []
 
         tours, cost = iteration_best_solution
         if cost != float('inf') and cost > 0:
-            pheromone_deposit = 1.0 / cost
-            self._apply_pheromone_deposit(tours, pheromone_deposit)
+            deposits.append((self._flatten_tours(tours), 1.0 / cost))
 
-        if self.global_best_cost != float('inf'):
+        if self.global_best_cost != float('inf') and self.global_best_cost > 0:
             elitist_deposit = self.eas_elitism_factor * (1.0 / self.global_best_cost)
-            self._apply_pheromone_deposit(self.global_best_solution, elitist_deposit)
+            deposits.append((self._global_best_flat, elitist_deposit))
+
+        self._evaporate_and_deposit(self.evaporation_rate, deposits)
             
     def _update_mmas_pheromone_limits(self):
         """MMAS için feromon alt ve üst limitlerini global en iyi maliyete göre günceller."""
@@ -120,7 +399,7 @@ class ACOptimizer:
             return
 
         self.pheromone_max = 1 / (self.mmas_rho * self.global_best_cost)
-        n = len(self.nodes_info)
+        n = self.num_nodes
         p_best = 0.05
         denominator = (n / 2 - 1) * (p_best ** (1 / n))
         if denominator > 0:
@@ -130,22 +409,18 @@ class ACOptimizer:
             
         if not self.mmas_initialized:
             logging.info("İlk çözüm bulundu. MMAS feromonları τ_max'a ayarlanıyor...")
-            for edge in self.pheromones:
-                self.pheromones[edge] = self.pheromone_max
+            self.pheromones.fill(self.pheromone_max)
             self.mmas_initialized = True
 
     def _update_pheromones_mmas(self, best_solution_of_iteration: Tuple[List[List[int]], float]):
         """Max-Min Ant System (MMAS) stratejisine göre feromonları günceller."""
-        for edge in self.pheromones:
-            self.pheromones[edge] *= (1 - self.mmas_rho)
+        deposits = []
 
         tours, cost = best_solution_of_iteration
         if cost != float('inf') and cost > 0:
-            pheromone_deposit = 1.0 / cost
-            self._apply_pheromone_deposit(tours, pheromone_deposit)
-        
-        for edge in self.pheromones:
-            self.pheromones[edge] = max(self.pheromone_min, min(self.pheromones[edge], self.pheromone_max))
+            deposits.append((self._flatten_tours(tours), 1.0 / cost))
+
+        self._evaporate_and_deposit(self.mmas_rho, deposits, self.pheromone_min, self.pheromone_max)
     
     def _update_pheromones(self, iteration_best_solution: Tuple[List[List[int]], float]):
         """Seçilen stratejiye göre uygun feromon güncelleme metodunu çağırır."""
@@ -155,16 +430,71 @@ class ACOptimizer:
             if iteration_best_solution[1] != float('inf'):
                 self._update_pheromones_mmas(iteration_best_solution)
 
-    def _calculate_cost(self, ant: Ant) -> float:
-        """Bir karıncanın oluşturduğu çözümün toplam maliyetini hesaplar."""
-        num_tours = len([tour for tour in ant.tours if len(tour) > 2])
-        base_cost = ant.total_distance
-        time_penalty = self._TIME_PENALTY if ant.time_window_violated else 0
-        wait_penalty = ant.total_wait_time * self._WAIT_PENALTY_MULTIPLIER
+    def _solution_cost(self, tours: List[List[int]], total_distance: float, total_wait_time: float, time_window_violated: bool) -> float:
+        """Bir çözümün mesafe, sabit araç maliyeti ve cezalarla birlikte toplam maliyetini hesaplar."""
+        num_tours = sum(1 for tour in tours if len(tour) > 2)
+        base_cost = total_distance
+        time_penalty = self._TIME_PENALTY if time_window_violated else 0
+        wait_penalty = total_wait_time * self._WAIT_PENALTY_MULTIPLIER
         fixed_cost = num_tours * self.vehicle_fixed_cost
 
         return base_cost + fixed_cost + time_penalty + wait_penalty
 
+    def _calculate_cost(self, ant: Ant) -> float:
+        """Bir karıncanın oluşturduğu çözümün toplam maliyetini hesaplar."""
+        return self._solution_cost(ant.tours, ant.total_distance, ant.total_wait_time, ant.time_window_violated)
+
+    def _share_arrays(self):
+        """
+        Feromon ve sabit matrisleri paylaşımlı belleğe taşır. Feromon güncellemeleri
+        yerinde yapıldığından `self.pheromones` paylaşımlı görünüme çevrilir ve
+        işçiler her iterasyonda matrislerin kopyası yerine yalnızca blok adlarını alır.
+        """
+        for name in _SHARED_ARRAY_NAMES:
+            shm, view = _shared_arrays.to_shared(getattr(self, name))
+            self._shared_blocks.append(shm)
+            self._shared_specs[name] = _shared_arrays.spec_of(shm, view)
+            if name == 'pheromones':
+                self.pheromones = view
+
+    def _release_shared_arrays(self):
+        """Paylaşımlı bellek bloklarını serbest bırakır; feromonlar normal bir diziye geri kopyalanır."""
+        if not self._shared_blocks:
+            return
+        self.pheromones = np.array(self.pheromones)
+        _shared_arrays.release(self._shared_blocks)
+        self._shared_blocks = []
+        self._shared_specs = {}
+
+    def _construct_solutions(self) -> List[ColonySolution]:
+        """Bu iterasyonun filo çözümlerini, gerekirse paralel olarak oluşturur."""
+        if self.colony_size > 1 and self.n_jobs != 1:
+            rngs = self.rng.spawn(self.colony_size)
+            if self.parallel_backend == "threads":
+                # Her koloni üyesinin kendi karınca kümesi (ve tamponları) vardır;
+                # feromon ve sabit matrisler kopyalanmadan iş parçacıklarınca paylaşılır.
+                if not self._thread_ants:
+                    self._thread_ants = [self._build_ants(rng) for rng in rngs]
+                for ants, rng in zip(self._thread_ants, rngs):
+                    for ant in ants:
+                        ant.rng = rng
+                return Parallel(n_jobs=self.n_jobs, prefer="threads")(
+                    delayed(construct_colony_solution)(ants, self.pheromones, self.num_nodes, self.alpha, self.beta)
+                    for ants in self._thread_ants
+                )
+            if not self._shared_blocks:
+                self._share_arrays()
+            return Parallel(n_jobs=self.n_jobs)(
+                delayed(construct_colony_solution_shared)(
+                    self._shared_specs, self.start_idx, self.vehicle_fleet, self.alpha, self.beta, rng
+                )
+                for rng in rngs
+            )
+        return [
+            construct_colony_solution(self.ants, self.pheromones, self.num_nodes, self.alpha, self.beta)
+            for _ in range(self.colony_size)
+        ]
+
     def run(self, iterations: int) -> Tuple[List[List[int]], float, List[float]]:
         """
         ACO optimizasyonunu belirtilen iterasyon sayısı kadar çalıştırır.
@@ -174,63 +504,40 @@ class ACOptimizer:
         cost_history = []
         progress_bar = tqdm(range(iterations), desc=f"ACO Optimizasyonu ({self.strategy.upper()})")
 
+        try:
+            self._run_iterations(progress_bar, cost_history)
+        finally:
+            progress_bar.close()
+            self._release_shared_arrays()
+    
+        self.distance_cache.save_to_disk()
+        logging.info(f"Optimizasyon tamamlandı. En iyi maliyet: {self.global_best_cost}")
+        return self._to_node_ids(self.global_best_solution), self.global_best_cost, cost_history
+
+    def _run_iterations(self, progress_bar, cost_history: List[float]):
+        """`run` tarafından çağrılan ana iterasyon döngüsü."""
+        last_improvement = -1
         for i in progress_bar:
-            colony_solution_tours = []
-            colony_total_distance = 0.0
-            colony_total_wait_time = 0.0
-            colony_time_window_violated = False
-
-            iteration_unvisited_nodes = {
-                node_id: info 
-                for node_id, info in self.nodes_info.items() 
-                if node_id != self.start_node
-            }
-
-            for ant in self.ants:
-                if not iteration_unvisited_nodes:
-                    break
-
-                ant.reset()
-
-                while True:
-                    next_node = ant._select_next_node(
-                        self.pheromones,
-                        iteration_unvisited_nodes,
-                        self.alpha,
-                        self.beta
-                    )
-
-                    if next_node is None:
-                        break
-
-                    ant.move_to_node(next_node, self.nodes_info)
-                
-                    del iteration_unvisited_nodes[next_node]
-
-                ant.finalize_solution()
-
-                colony_solution_tours.extend(ant.tours)
-                colony_total_distance += ant.total_distance
-                colony_total_wait_time += ant.total_wait_time
-                if ant.time_window_violated:
-                    colony_time_window_violated = True
-        
-            if iteration_unvisited_nodes:
-                total_cost = float('inf')
-                logging.warning(f"İterasyon {i+1}, filonun kapasitesi/zamanı yetmediği için {len(iteration_unvisited_nodes)} durağı ziyaret edemedi.")
-            else:
-                num_tours = len([tour for tour in colony_solution_tours if len(tour) > 2])
-                base_cost = colony_total_distance
-                time_penalty = self._TIME_PENALTY if colony_time_window_violated else 0
-                wait_penalty = colony_total_wait_time * self._WAIT_PENALTY_MULTIPLIER
-                fixed_cost = num_tours * self.vehicle_fixed_cost
-                total_cost = base_cost + fixed_cost + time_penalty + wait_penalty
-
-            iteration_best_solution = (colony_solution_tours, total_cost)
+            iteration_best_solution = ([], float('inf'))
+            min_unvisited = None
+
+            for tours, total_distance, total_wait_time, time_window_violated, num_unvisited in self._construct_solutions():
+                if num_unvisited:
+                    min_unvisited = num_unvisited if min_unvisited is None else min(min_unvisited, num_unvisited)
+                    continue
+                total_cost = self._solution_cost(tours, total_distance, total_wait_time, time_window_violated)
+                if total_cost < iteration_best_solution[1]:
+                    iteration_best_solution = (tours, total_cost)
+
+            tours, total_cost = iteration_best_solution
+            if total_cost == float('inf') and min_unvisited is not None:
+                logging.warning(f"İterasyon {i+1}, filonun kapasitesi/zamanı yetmediği için {min_unvisited} durağı ziyaret edemedi.")
 
             if total_cost < self.global_best_cost:
                 self.global_best_cost = total_cost
-                self.global_best_solution = colony_solution_tours
+                self.global_best_solution = tours
+                self._global_best_flat = self._flatten_tours(tours)
+                last_improvement = i
             
                 if self.strategy == "mmas":
                     self._update_mmas_pheromone_limits()
@@ -240,7 +547,7 @@ class ACOptimizer:
             cost_history.append(self.global_best_cost)
             display_cost = f"{self.global_best_cost/1000:.2f}k" if self.global_best_cost != float('inf') else 'GEÇERSİZ'
             progress_bar.set_postfix({"En İyi Maliyet": display_cost})
-    
-        self.distance_cache.save_to_disk()
-        logging.info(f"Optimizasyon tamamlandı. En iyi maliyet: {self.global_best_cost}")
-        return self.global_best_solution, self.global_best_cost, cost_history
\ No newline at end of file
+
+            if self.stagnation_limit and i - last_improvement >= self.stagnation_limit:
+                logging.info(f"En iyi maliyet {self.stagnation_limit} iterasyondur iyileşmedi; optimizasyon {i+1}. iterasyonda durduruluyor.")
+                break
\ No newline at end of file
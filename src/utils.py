@@ -1,28 +1,65 @@
 import os
+import ast
 import json
+import atexit
+import weakref
+import hashlib
+import zipfile
+from functools import reduce
+from operator import getitem
 import requests
+from requests.adapters import HTTPAdapter
+import numpy as np
 import networkx as nx
-from typing import Dict, Tuple
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+from typing import Dict, List, Optional, Tuple
 
 Graph = nx.MultiDiGraph
 CacheDict = Dict[Tuple[int, int], float]
+DEFAULT_OSRM_CACHE_DIR = "data/cache/osrm"
+
 class OSRMDistanceProvider:
     """
     Calculates distances and durations by querying a local OSRM server.
-    Caches results in memory to avoid repeated API calls.
+    Caches results in memory to avoid repeated API calls. Under `cache_dir`
+    (None disables disk caching) full travel matrices are stored as .npz files.
+    All requests go through one pooled HTTP session, so connections to the
+    server are kept alive and reused.
     """
-    def __init__(self, graph: nx.Graph, host: str):
+    def __init__(
+        self,
+        graph: nx.Graph,
+        host: str,
+        max_table_size: int = 100,
+        cache_dir: Optional[str] = DEFAULT_OSRM_CACHE_DIR
+    ):
         self.host = host
-        self.node_coords = self._extract_node_coords(graph)
+        self.max_table_size = max_table_size
+        self.cache_dir = cache_dir
+        self.node_ids, self.coords, self.node_to_idx = self._extract_node_coords(graph)
         self._cache: Dict[Tuple[int, int], Tuple[float, float]] = {}
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=64)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
         print(f"OSRM Mesafe/Süre Sağlayıcı başlatıldı. Sunucu: {self.host}")
 
-    def _extract_node_coords(self, graph: nx.Graph) -> Dict[int, Tuple[float, float]]:
-        """Extracts longitude and latitude for each node from the graph."""
-        coords = {}
-        for node, data in graph.nodes(data=True):
-            coords[node] = (data['x'], data['y'])
-        return coords
+    def _extract_node_coords(self, graph: nx.Graph) -> Tuple[np.ndarray, np.ndarray, Dict[int, int]]:
+        """
+        Extracts longitude and latitude for each node in one pass. Returns the
+        node ids, an (N, 2) array of (lon, lat) rows in the same order and the
+        node id -> row index mapping.
+        """
+        num_nodes = graph.number_of_nodes()
+        node_ids = np.empty(num_nodes, dtype=np.int64)
+        coords = np.empty((num_nodes, 2), dtype=np.float64)
+        for i, (node, data) in enumerate(graph.nodes(data=True)):
+            node_ids[i] = node
+            coords[i, 0] = data['x']
+            coords[i, 1] = data['y']
+        node_to_idx = dict(zip(node_ids.tolist(), range(num_nodes)))
+        return node_ids, coords, node_to_idx
 
     def get_travel_info(self, u_node: int, v_node: int) -> Tuple[float, float]:
         """
@@ -32,13 +69,14 @@ class OSRMDistanceProvider:
         if u_node == v_node:
             return 0.0, 0.0
 
-        edge = tuple(sorted((u_node, v_node)))
-        if edge in self._cache:
-            return self._cache[edge]
+        edge = (u_node, v_node) if u_node < v_node else (v_node, u_node)
+        cached = self._cache.get(edge)
+        if cached is not None:
+            return cached
 
         try:
-            lon1, lat1 = self.node_coords[u_node]
-            lon2, lat2 = self.node_coords[v_node]
+            lon1, lat1 = self.coords[self.node_to_idx[u_node]]
+            lon2, lat2 = self.coords[self.node_to_idx[v_node]]
         except KeyError as e:
             print(f"UYARI: Düğüm ID'si {e} için koordinat bulunamadı.")
             return float('inf'), float('inf')
@@ -46,7 +84,7 @@ class OSRMDistanceProvider:
         url = f"{self.host}/route/v1/driving/{lon1},{lat1};{lon2},{lat2}?overview=false"
 
         try:
-            response = requests.get(url, timeout=10)
+            response = self._session.get(url, timeout=10)
             response.raise_for_status()
             data = response.json()
             
@@ -65,6 +103,130 @@ class OSRMDistanceProvider:
             print(f"KRİTİK HATA: OSRM sunucusuna bağlanılamadı. Hata: {e}")
             return float('inf'), float('inf')
 
+    def get_travel_matrices(self, node_ids: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Builds the full float32 distance (meters) and duration (minutes)
+        matrices for `node_ids`, indexed in the given order.
+
+        Matrices are computed for the sorted node ids, so any ordering of the
+        same stop set shares one result, and are stored in `cache_dir`
+        keyed by the server and that id set. Later runs on the same stops load
+        the file instead of querying OSRM. Results with failed requests or
+        missing coordinates are not cached. Files are replaced atomically, so
+        parallel runs on the same stops never read a partial file; an
+        unreadable file is ignored and the matrices are queried again.
+        """
+        sorted_ids = np.sort(np.asarray(node_ids, dtype=np.int64))
+        cache_path = self._matrix_cache_path(sorted_ids) if self.cache_dir else None
+
+        cached_matrices = self._load_matrix_cache(cache_path) if cache_path else None
+        if cached_matrices is not None:
+            dist_matrix, time_matrix = cached_matrices
+        else:
+            dist_matrix, time_matrix, complete = self._query_travel_matrices(sorted_ids.tolist())
+            if cache_path and complete:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+                # A file object keeps np.savez from appending '.npz' to the given path.
+                with open(tmp_path, 'wb') as f:
+                    np.savez(f, node_ids=sorted_ids, dist=dist_matrix, time=time_matrix)
+                os.replace(tmp_path, cache_path)
+
+        rank = np.searchsorted(sorted_ids, np.asarray(node_ids, dtype=np.int64))
+        index = np.ix_(rank, rank)
+        return dist_matrix[index], time_matrix[index]
+
+    def _load_matrix_cache(self, cache_path: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Loads cached (distance, time) matrices, or returns None if the file is missing or unreadable."""
+        if not os.path.exists(cache_path):
+            return None
+        try:
+            with np.load(cache_path) as cached:
+                return cached['dist'], cached['time']
+        except (OSError, ValueError, EOFError, zipfile.BadZipFile, KeyError) as e:
+            print(f"OSRM matris önbelleği okunamadı: {e}. Matrisler sunucudan yeniden sorgulanacak.")
+            return None
+
+    def _matrix_cache_path(self, sorted_ids: np.ndarray) -> str:
+        """Returns the .npz path for the matrices of `sorted_ids` on this server."""
+        digest = hashlib.sha1(self.host.encode() + sorted_ids.tobytes()).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.npz")
+
+    def _query_travel_matrices(self, node_ids: List[int]) -> Tuple[np.ndarray, np.ndarray, bool]:
+        """
+        Queries the travel matrices with OSRM's /table service instead of one
+        /route request per pair. Up to `max_table_size` coordinates go in a
+        single request; larger sets are split into blocks, and each request
+        covers one pair of blocks. Entry [i, j] is the i -> j trip for i < j,
+        mirrored below the diagonal, matching the pairwise results of
+        get_travel_info. Unreachable pairs, failed requests and nodes without
+        coordinates are infinite; the returned flag is False if any request
+        failed or a node had no coordinates.
+        """
+        n = len(node_ids)
+        dist_matrix = np.full((n, n), np.inf, dtype=np.float32)
+        time_matrix = np.full((n, n), np.inf, dtype=np.float32)
+        np.fill_diagonal(dist_matrix, 0.0)
+        np.fill_diagonal(time_matrix, 0.0)
+
+        coord_rows = np.fromiter((self.node_to_idx.get(node, -1) for node in node_ids), dtype=np.int64, count=n)
+        known = np.flatnonzero(coord_rows >= 0).tolist()
+        if len(known) < n:
+            print(f"UYARI: {n - len(known)} düğüm için koordinat bulunamadı.")
+        complete = len(known) == n
+
+        block_size = len(known) if len(known) <= self.max_table_size else max(1, self.max_table_size // 2)
+        blocks = [known[start:start + block_size] for start in range(0, len(known), block_size)]
+
+        for bi, sources in enumerate(blocks):
+            for destinations in blocks[bi:]:
+                if not self._fill_table_block(coord_rows, sources, destinations, dist_matrix, time_matrix):
+                    complete = False
+
+        # Keep the i -> j (i < j) trips and mirror them, as the pairwise cache does.
+        lower = np.tril_indices(n, -1)
+        dist_matrix[lower] = dist_matrix.T[lower]
+        time_matrix[lower] = time_matrix.T[lower]
+        return dist_matrix, time_matrix, complete
+
+    def _fill_table_block(
+        self,
+        coord_rows: np.ndarray,
+        sources: List[int],
+        destinations: List[int],
+        dist_matrix: np.ndarray,
+        time_matrix: np.ndarray
+    ) -> bool:
+        """
+        Queries one sources x destinations block of the /table service into the
+        matrices. `coord_rows` maps matrix indices to rows of `self.coords`.
+        Returns False if the request failed.
+        """
+        indices = sources if sources is destinations else sources + destinations
+        coordinates = ';'.join(f'{lon},{lat}' for lon, lat in self.coords[coord_rows[indices]].tolist())
+        url = f"{self.host}/table/v1/driving/{coordinates}?annotations=distance,duration"
+        if sources is not destinations:
+            url += "&sources=" + ';'.join(str(k) for k in range(len(sources)))
+            url += "&destinations=" + ';'.join(str(k) for k in range(len(sources), len(indices)))
+
+        try:
+            response = self._session.get(url, timeout=30)
+            response.raise_for_status()
+            data = response.json()
+        except requests.exceptions.RequestException as e:
+            print(f"KRİTİK HATA: OSRM sunucusuna bağlanılamadı. Hata: {e}")
+            return False
+        if data.get('code') != 'Ok':
+            return False
+
+        rows, cols = np.ix_(sources, destinations)
+        # OSRM reports unreachable pairs as null, which becomes NaN and then inf.
+        distances = np.array(data['distances'], dtype=np.float64)
+        durations = np.array(data['durations'], dtype=np.float64) / 60.0
+        dist_matrix[rows, cols] = np.nan_to_num(distances, nan=np.inf)
+        time_matrix[rows, cols] = np.nan_to_num(durations, nan=np.inf)
+        return True
+
     def get_distance(self, u_node: int, v_node: int) -> float:
         """
         Gets only the driving distance in meters.
@@ -76,73 +238,211 @@ class OSRMDistanceProvider:
 
     def save_to_disk(self):
         """
-        This method exists for compatibility.
+        This method exists for compatibility. Full travel matrices are already
+        written to `cache_dir` by get_travel_matrices.
         """
         print(f"OSRM oturum önbelleğinde {len(self._cache)} adet seyahat bilgisi (mesafe/süre) biriktirildi.")
 
+def _graph_to_csr(graph: nx.Graph) -> Tuple[csr_matrix, Dict[int, int]]:
+    """
+    Converts a graph's 'length' edges to a CSR matrix over node indices 0..V-1
+    and returns it with the node-to-index map. Parallel edges keep only the
+    shortest one; zero-length edges stay as explicit entries so the csgraph
+    routines still treat them as edges. Edges without a 'length' are
+    infinitely long, as in _flatten_multigraph, so no path uses them.
+    """
+    node_index = {node: i for i, node in enumerate(graph.nodes)}
+    edges = list(graph.edges(data='length', default=float('inf')))
+    rows = np.fromiter((node_index[u] for u, _, _ in edges), dtype=np.int64, count=len(edges))
+    cols = np.fromiter((node_index[v] for _, v, _ in edges), dtype=np.int64, count=len(edges))
+    lengths = np.fromiter((length for _, _, length in edges), dtype=np.float64, count=len(edges))
+
+    # Sort by (row, col, length) so the first entry of each (row, col) run is
+    # the shortest parallel edge; the csr constructor would otherwise sum them.
+    order = np.lexsort((lengths, cols, rows))
+    rows, cols, lengths = rows[order], cols[order], lengths[order]
+    first = np.ones(len(rows), dtype=bool)
+    first[1:] = (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])
+    csr = csr_matrix((lengths[first], (rows[first], cols[first])), shape=(len(node_index), len(node_index)))
+    return csr, node_index
+
+# Canlı DistanceCache nesneleri; çıkışta tek bir atexit kancası hepsini kaydeder.
+_LIVE_DISTANCE_CACHES: "weakref.WeakSet[DistanceCache]" = weakref.WeakSet()
+
+@atexit.register
+def _save_caches_at_exit() -> None:
+    """atexit hook: saves every DistanceCache that is still alive."""
+    for cache in list(_LIVE_DISTANCE_CACHES):
+        cache.save_to_disk()
+
 class DistanceCache:
     """
     Manages a two-level cache for node-to-node distances to speed up
-    repeated shortest_path calculations.
+    repeated shortest_path calculations. The disk file is rewritten only when
+    new distances were computed, and is also saved at interpreter exit so an
+    aborted run keeps what it computed.
     """
-    def __init__(self, graph: Graph, cache_filepath: str = "data/cache/distance_cache.json"):
+    def __init__(self, graph: Graph, cache_filepath: str = "data/cache/distance_cache.npz"):
         print("Mesafe önbelleği (DistanceCache) başlatılıyor...")
-        self.graph = graph
+        self.graph = self._flatten_multigraph(graph)
         self.cache_filepath = cache_filepath
         self.memory_cache: CacheDict = {}
+        self.stop_idx: Dict[int, int] = {}
+        self.stop_matrix: Optional[np.ndarray] = None
+        self._num_saved = 0
+        self._csr: Optional[csr_matrix] = None
+        self._node_index: Dict[int, int] = {}
         self.load_from_disk()
+        _LIVE_DISTANCE_CACHES.add(self)
+
+    @staticmethod
+    def _flatten_multigraph(graph: nx.Graph) -> nx.Graph:
+        """
+        Collapses parallel edges into one edge holding the minimum 'length',
+        keeping directedness and node attributes. Dijkstra on a multigraph
+        scans every parallel edge's data dict per relaxation; on the flat
+        graph each edge weight is a single lookup.
+        """
+        if not graph.is_multigraph():
+            return graph
+        flat = nx.DiGraph() if graph.is_directed() else nx.Graph()
+        flat.graph.update(graph.graph)
+        flat.add_nodes_from(graph.nodes(data=True))
+        for u, v, length in graph.edges(data='length', default=float('inf')):
+            if not flat.has_edge(u, v) or length < flat[u][v]['length']:
+                flat.add_edge(u, v, length=length)
+        return flat
+
+    def precompute(self, stops: List[int]) -> np.ndarray:
+        """
+        Computes all stop-to-stop distances with one single-source Dijkstra per
+        stop instead of one Dijkstra per pair, and keeps them in a dense matrix
+        (row i holds the distances from stops[i], inf if unreachable).
+        get_distance then answers any pair of these stops with an array read.
+
+        The searches run in scipy's compiled Dijkstra over a CSR copy of the
+        graph, built once per cache. Sources are passed one at a time so only
+        one row of length V is held in memory, not a stops x V matrix.
+        """
+        print(f"{len(stops)} durak için mesafe matrisi ön-hesaplanıyor...")
+        if self._csr is None:
+            self._csr, self._node_index = _graph_to_csr(self.graph)
+        stop_idx = {node: i for i, node in enumerate(stops)}
+        matrix = np.full((len(stops), len(stops)), np.inf)
+        known = np.array([node in self._node_index for node in stops], dtype=bool)
+        columns = np.array([self._node_index[node] for node in stops if node in self._node_index], dtype=np.int64)
+        directed = self.graph.is_directed()
+        for i, source in enumerate(stops):
+            if not known[i]:
+                continue
+            lengths = dijkstra(self._csr, directed=directed, indices=self._node_index[source])
+            matrix[i, known] = lengths[columns]
+        self.stop_idx = stop_idx
+        self.stop_matrix = matrix
+        return matrix
 
     def get_distance(self, u: int, v: int) -> float:
         if u == v:
             return 0.0
-        edge = tuple(sorted((u, v)))
-        if edge in self.memory_cache:
-            return self.memory_cache[edge]
+        if self.stop_matrix is not None:
+            # Looked up in the given direction: on a directed graph the matrix
+            # holds different u -> v and v -> u distances.
+            i = self.stop_idx.get(u)
+            j = self.stop_idx.get(v)
+            if i is not None and j is not None:
+                return float(self.stop_matrix[i, j])
+        edge = (u, v) if u < v else (v, u)
+        distance = self.memory_cache.get(edge)
+        if distance is not None:
+            return distance
         try:
-            distance = nx.shortest_path_length(self.graph, u, v, weight='length')
+            # Point-to-point query: searching from both ends settles far fewer
+            # nodes than a one-sided Dijkstra on a city-sized graph.
+            distance, _ = nx.bidirectional_dijkstra(self.graph, u, v, weight='length')
         except (nx.NetworkXNoPath, nx.NodeNotFound):
             distance = float('inf')
         self.memory_cache[edge] = distance
         return distance
 
     def load_from_disk(self) -> None:
+        """
+        Loads the cache written by save_to_disk: parallel NumPy arrays of edge
+        endpoints and distances, so no key has to be parsed back from text.
+        """
         if os.path.exists(self.cache_filepath) and os.path.getsize(self.cache_filepath) > 0:
             print(f"'{self.cache_filepath}' adresinden kalıcı önbellek yükleniyor...")
             try:
-                with open(self.cache_filepath, 'r') as f:
-                    str_key_cache: Dict[str, float] = json.load(f)
-                    self.memory_cache = {eval(key): value for key, value in str_key_cache.items()}
+                with np.load(self.cache_filepath) as cached:
+                    edges = zip(cached['u'].tolist(), cached['v'].tolist())
+                    self.memory_cache = dict(zip(edges, cached['dist'].tolist()))
                 print(f"{len(self.memory_cache)} adet mesafe önbellekten yüklendi.")
-            except (json.JSONDecodeError, TypeError) as e:
+            except (OSError, ValueError, KeyError) as e:
                 print(f"Önbellek dosyası okunurken hata oluştu: {e}. Boş bir önbellek ile devam ediliyor.")
                 self.memory_cache = {}
+        elif os.path.exists(self._legacy_json_path()):
+            self._migrate_legacy_json()
+            return
         else:
             print("Kalıcı önbellek dosyası bulunamadı veya boş. Yeni bir önbellek oluşturulacak.")
             self.memory_cache = {}
+        self._num_saved = len(self.memory_cache)
+
+    def _legacy_json_path(self) -> str:
+        """Returns the path of the JSON cache that earlier versions wrote next to the .npz file."""
+        return os.path.splitext(self.cache_filepath)[0] + ".json"
+
+    def _migrate_legacy_json(self) -> None:
+        """
+        Loads an old-format JSON cache ({"(u, v)": distance}) once. Keys are
+        parsed with ast.literal_eval, and the entries count as unsaved, so the
+        next save_to_disk writes them out in the .npz format.
+        """
+        legacy_path = self._legacy_json_path()
+        print(f"Eski biçimli '{legacy_path}' önbelleği .npz biçimine taşınıyor...")
+        try:
+            with open(legacy_path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+            self.memory_cache = {tuple(ast.literal_eval(key)): float(value) for key, value in raw.items()}
+        except (OSError, ValueError, SyntaxError, TypeError) as e:
+            print(f"Eski önbellek dosyası okunamadı: {e}. Boş bir önbellek ile devam ediliyor.")
+            self.memory_cache = {}
+        self._num_saved = 0
 
     def save_to_disk(self) -> None:
+        """Writes the cache as .npz arrays if it grew since it was loaded or last saved, replacing the file atomically."""
+        if len(self.memory_cache) == self._num_saved:
+            return
         print(f"Güncel mesafe önbelleği '{self.cache_filepath}' adresine kaydediliyor...")
-        str_key_cache = {str(key): value for key, value in self.memory_cache.items()}
-        os.makedirs(os.path.dirname(self.cache_filepath), exist_ok=True)
-        with open(self.cache_filepath, 'w') as f:
-            json.dump(str_key_cache, f, indent=4)
-        print(f"{len(str_key_cache)} adet mesafe başarıyla kalıcı önbelleğe kaydedildi.")
+        edges = np.array(list(self.memory_cache.keys()), dtype=np.int64).reshape(-1, 2)
+        distances = np.fromiter(self.memory_cache.values(), dtype=np.float64, count=len(self.memory_cache))
+        os.makedirs(os.path.dirname(self.cache_filepath) or ".", exist_ok=True)
+        tmp_path = f"{self.cache_filepath}.{os.getpid()}.tmp"
+        # A file object keeps np.savez from appending '.npz' to the given path.
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, u=edges[:, 0], v=edges[:, 1], dist=distances)
+        os.replace(tmp_path, self.cache_filepath)
+        self._num_saved = len(distances)
+        print(f"{len(distances)} adet mesafe başarıyla kalıcı önbelleğe kaydedildi.")
     
+# CLI argümanı -> yapılandırmadaki anahtar yolu; tablo modül yüklenirken bir kez kurulur.
+_ARG_TO_CONFIG_KEYS = {
+    'strategy': ('problem', 'strategy'),
+    'num_stops': ('problem', 'num_stops'),
+    'scenario': ('problem', 'scenario_filepath'),
+    'ants': ('aco', 'ant_count'),
+    'iterations': ('aco', 'iterations'),
+    'output': ('output', 'map_filename'),
+}
+
 def update_config_with_args(config: dict, args) -> dict:
-    arg_to_config_map = {
-        'strategy': ('problem', 'strategy'),
-        'num_stops': ('problem', 'num_stops'),
-        'scenario': ('problem', 'scenario_filepath'),
-        'ants': ('aco', 'ant_count'),
-        'iterations': ('aco', 'iterations'),
-        'output': ('output', 'map_filename'),
-    }
-    for arg_name, config_keys in arg_to_config_map.items():
+    updates = []
+    for arg_name, config_keys in _ARG_TO_CONFIG_KEYS.items():
         arg_value = getattr(args, arg_name, None)
-        if arg_value is not None:
-            temp_dict = config
-            for key in config_keys[:-1]:
-                temp_dict = temp_dict[key]
-            temp_dict[config_keys[-1]] = arg_value
-            print(f"Yapılandırma güncellendi: '{'.'.join(config_keys)}' -> {arg_value}")
-    return config
\ No newline at end of file
+        if arg_value is None:
+            continue
+        parent = reduce(getitem, config_keys[:-1], config)
+        parent[config_keys[-1]] = arg_value
+        updates.append(f"Yapılandırma güncellendi: '{'.'.join(config_keys)}' -> {arg_value}")
+    if updates:
+        print('\n'.join(updates))
+    return config
@@ -1,11 +1,66 @@
 import folium
+import numpy as np
 import osmnx as ox
 import networkx as nx
-import pandas as pd
-import matplotlib.pyplot as plt
-from folium.plugins import MarkerCluster
+from matplotlib.figure import Figure
+from folium.plugins import FastMarkerCluster
 from typing import List, Optional, Dict
 
+# Durak satırlarını ([enlem, boylam, düğüm ID, talep]) Leaflet işaretçisine
+# çeviren JavaScript fonksiyonu; ikon bir kez oluşturulup tüm duraklarda kullanılır.
+_STOP_MARKER_CALLBACK = """(function () {
+    var icon = L.AwesomeMarkers.icon({markerColor: 'darkred', iconColor: 'white', icon: 'info-sign', prefix: 'glyphicon'});
+    return function (row) {
+        var marker = L.marker(new L.LatLng(row[0], row[1]), {icon: icon});
+        marker.bindPopup('<b>Durak ID: ' + row[2] + '</b><br>Talep: ' + row[3]);
+        return marker;
+    };
+})()"""
+
+def _shortest_paths_from(graph: nx.MultiDiGraph, source: int, targets: List[int]) -> Dict[int, Optional[List[int]]]:
+    """
+    Bir kaynaktan verilen hedeflere en kısa yolları (düğüm listeleri) döndürür;
+    yol yoksa değer None olur. Tek hedefte hedefe ulaşınca duran normal sorgu
+    kullanılır. Birden fazla hedefte (ör. her turun başladığı depo) Dijkstra
+    kaynaktan bir kez çalıştırılır ve tüm yollar aynı öncül ağacından okunur.
+    """
+    if len(targets) == 1:
+        target = targets[0]
+        try:
+            return {target: nx.shortest_path(graph, source, target, weight='length')}
+        except nx.NetworkXNoPath:
+            return {target: None}
+
+    predecessors, _ = nx.dijkstra_predecessor_and_distance(graph, source, weight='length')
+    paths: Dict[int, Optional[List[int]]] = {}
+    for target in targets:
+        if target not in predecessors:
+            paths[target] = None
+            continue
+        path = [target]
+        while path[-1] != source:
+            path.append(predecessors[path[-1]][0])
+        path.reverse()
+        paths[target] = path
+    return paths
+
+def _path_coordinates(graph: nx.MultiDiGraph, path: List[int]) -> np.ndarray:
+    """
+    Bir düğüm yolunun (enlem, boylam) noktalarını (n, 2) dizi olarak döndürür.
+    Paralel kenarlardan en kısası seçilir; kenarın 'geometry' verisi varsa yolun
+    gerçek şekli, yoksa iki uç düğüm arasındaki düz çizgi kullanılır.
+    """
+    nodes = graph.nodes
+    points = [(nodes[path[0]]['y'], nodes[path[0]]['x'])]
+    for u, v in zip(path[:-1], path[1:]):
+        edge = min(graph[u][v].values(), key=lambda data: data['length'])
+        geometry = edge.get('geometry')
+        if geometry is not None:
+            points.extend((y, x) for x, y in geometry.coords[1:])
+        else:
+            points.append((nodes[v]['y'], nodes[v]['x']))
+    return np.array(points, dtype=np.float64)
+
 def plot_optimized_route(
     graph: nx.MultiDiGraph,
     best_solution: List[List[int]],
@@ -25,7 +80,21 @@ def plot_optimized_route(
     
     cmap_list = ['plasma', 'viridis', 'cividis', 'inferno', 'magma', 'coolwarm']
     
-    all_routes_gdf = []
+    route_lines = []
+
+    # Segmentler kaynak düğüme göre gruplanır; böylece birden çok segmentin
+    # başladığı düğümler (en azından depo) için Dijkstra yalnızca bir kez çalışır.
+    targets_by_source: Dict[int, List[int]] = {}
+    for tour in best_solution:
+        for source, target in zip(tour[:-1], tour[1:]):
+            targets = targets_by_source.setdefault(source, [])
+            if target not in targets:
+                targets.append(target)
+    segment_paths = {
+        (source, target): path
+        for source, targets in targets_by_source.items()
+        for target, path in _shortest_paths_from(graph, source, targets).items()
+    }
 
     for vehicle_index, tour in enumerate(best_solution):
         num_segments = len(tour) - 1
@@ -38,83 +107,80 @@ def plot_optimized_route(
         for i in range(num_segments):
             source = tour[i]
             target = tour[i+1]
-            try:
-                path_segment_nodes = ox.shortest_path(graph, source, target, weight='length')
-                if path_segment_nodes and len(path_segment_nodes) > 1:
-                    segment_gdf = ox.routing.route_to_gdf(graph, path_segment_nodes, weight="length")
-                    segment_gdf['color'] = colors[i]
-                    segment_gdf['vehicle'] = vehicle_index + 1
-                    all_routes_gdf.append(segment_gdf)
-            except nx.NetworkXNoPath:
+            path_segment_nodes = segment_paths[(source, target)]
+            if path_segment_nodes is None:
                 print(f"UYARI: {source} -> {target} arasında yönlü yol bulunamadı. Bu segment haritada gösterilmeyecek.")
                 continue
+            if len(path_segment_nodes) > 1:
+                route_lines.append((_path_coordinates(graph, path_segment_nodes), colors[i]))
 
-    if not all_routes_gdf:
+    if not route_lines:
         print("HATA: Çizilecek kadar geçerli bir yol segmenti bulunamadı.")
         return None
     
-    route_gdf = pd.concat(all_routes_gdf)
-    
     route_map = folium.Map(tiles="CartoDB positron")
     
-    folium.GeoJson(
-        route_gdf,
-        style_function=lambda feature: {
-            "color": feature['properties']['color'],
-            "weight": 5,
-            "opacity": 0.8,
-        }
-    ).add_to(route_map)
+    # Her segment, koordinatları doğrudan verilen bir PolyLine olarak çizilir;
+    # GeoDataFrame ve GeoJSON serileştirme adımlarına gerek kalmaz.
+    for coordinates, color in route_lines:
+        folium.PolyLine(coordinates.tolist(), color=color, weight=5, opacity=0.8).add_to(route_map)
     
-    route_map.fit_bounds(folium.GeoJson(route_gdf).get_bounds())
+    all_coordinates = np.vstack([coordinates for coordinates, _ in route_lines])
+    route_map.fit_bounds([all_coordinates.min(axis=0).tolist(), all_coordinates.max(axis=0).tolist()])
 
-    marker_cluster = MarkerCluster().add_to(route_map)
-    
     folium.Marker(
         location=(graph.nodes[start_node]['y'], graph.nodes[start_node]['x']),
         icon=folium.Icon(color='darkgreen', icon='truck', prefix='fa'),
         popup=f'<b>DEPO</b><br>ID: {start_node}'
     ).add_to(route_map)
     
-    visited_stops = set(nodes_to_visit) - {start_node}
-    for node_id in visited_stops:
-        demand = nodes_info.get(node_id, "Bilinmiyor")
-        folium.Marker(
-            location=(graph.nodes[node_id]['y'], graph.nodes[node_id]['x']),
-            icon=folium.Icon(color='darkred', icon='info-sign'),
-            popup=f'<b>Durak ID: {node_id}</b><br>Talep: {demand}'
-        ).add_to(marker_cluster)
+    # Durak koordinatları döngüden önce tek geçişte okunur; döngü yalnızca
+    # bu listeyi dolaşır ve graf görünümüne tekrar tekrar erişmez.
+    visited_stops = list(set(nodes_to_visit) - {start_node})
+    node_data = graph.nodes
+    stop_locations = [(node_data[node_id]['y'], node_data[node_id]['x']) for node_id in visited_stops]
+
+    # Duraklar tek bir JSON dizisi olarak yazılır ve işaretçiler tarayıcıda
+    # oluşturulur; her durak için ayrı bir Marker/Popup şablonu işlenmez.
+    # Tüm duraklar aynı ikon nesnesini paylaşır.
+    stop_rows = [
+        [lat, lon, int(node_id), str(nodes_info.get(node_id, "Bilinmiyor"))]
+        for node_id, (lat, lon) in zip(visited_stops, stop_locations)
+    ]
+    FastMarkerCluster(stop_rows, callback=_STOP_MARKER_CALLBACK).add_to(route_map)
 
     return route_map
 
 def plot_convergence(history: list, filename: str):
     """
     Plots the convergence of the algorithm over iterations and saves it to a file.
+    Uses a standalone Figure instead of pyplot's global state, so it is safe to
+    call from a background thread.
     """
     if not history or all(cost == float('inf') for cost in history):
         print("UYARI: Geçerli maliyet geçmişi bulunamadı, yakınsama grafiği oluşturulamıyor.")
         return
 
     print("Yakınsama grafiği oluşturuluyor...")
-    plt.figure(figsize=(12, 6))
+    fig = Figure(figsize=(12, 6))
+    ax = fig.subplots()
     
     history_km = [cost / 1000 if cost != float('inf') else float('nan') for cost in history]
     
-    plt.plot(history_km, marker='o', linestyle='-', color='b', markersize=4)
-    plt.title('Optimizasyonun İterasyonlara Göre Yakınsaması')
-    plt.xlabel('İterasyon')
-    plt.ylabel('En İyi Maliyet (km-eşdeğeri)')
-    plt.grid(True)
+    ax.plot(history_km, marker='o', linestyle='-', color='b', markersize=4)
+    ax.set_title('Optimizasyonun İterasyonlara Göre Yakınsaması')
+    ax.set_xlabel('İterasyon')
+    ax.set_ylabel('En İyi Maliyet (km-eşdeğeri)')
+    ax.grid(True)
     
     valid_costs = [cost for cost in history_km if cost is not None and not (isinstance(cost, float) and cost != cost)]
     if valid_costs:
         min_cost = min(valid_costs)
         min_iter = history_km.index(min_cost)
-        plt.axhline(y=min_cost, color='r', linestyle='--', label=f'En İyi: {min_cost:.2f} km')
-        plt.plot(min_iter, min_cost, 'r*', markersize=15)
+        ax.axhline(y=min_cost, color='r', linestyle='--', label=f'En İyi: {min_cost:.2f} km')
+        ax.plot(min_iter, min_cost, 'r*', markersize=15)
 
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(filename)
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(filename)
     print(f"Yakınsama grafiği başarıyla '{filename}' adresine kaydedildi.")
-    plt.close()
\ No newline at end of file
@@ -1,3 +1,4 @@
+import numpy as np
 import networkx as nx
 
 def create_mock_graph():
@@ -27,4 +28,27 @@ def create_mock_graph():
     ]
     G.add_edges_from(edges)
     
-    return G
\ No newline at end of file
+    return G
+
+def create_mock_travel_matrices(num_nodes: int, distance: float = 10.0, travel_time: float = 2.0):
+    """
+    Creates constant distance/travel-time matrices for compact node indices,
+    mirroring a distance provider that returns the same values for every pair.
+    """
+    dist_matrix = np.full((num_nodes, num_nodes), distance)
+    time_matrix = np.full((num_nodes, num_nodes), travel_time)
+    np.fill_diagonal(dist_matrix, 0.0)
+    np.fill_diagonal(time_matrix, 0.0)
+    return dist_matrix, time_matrix
+
+def create_node_arrays(nodes_info: dict):
+    """
+    Converts a compact-index keyed nodes_info dict into the demand, time
+    window and service time arrays consumed by Ant.
+    """
+    infos = [nodes_info[i] for i in range(len(nodes_info))]
+    demands = np.array([info['demand'] for info in infos], dtype=float)
+    tw_open = np.array([info['time_window'][0] for info in infos], dtype=float)
+    tw_close = np.array([info['time_window'][1] for info in infos], dtype=float)
+    service_times = np.array([info.get('service_time', 0) for info in infos], dtype=float)
+    return demands, tw_open, tw_close, service_times
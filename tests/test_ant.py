@@ -1,13 +1,13 @@
 import os
 import sys
 import pytest
-from unittest.mock import MagicMock
+import numpy as np
 
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, project_root)
 
-from src.optimization.ant import Ant
-from tests.helpers import create_mock_graph
+from src.optimization.ant import Ant, build_heuristic_tables, build_candidate_lists
+from tests.helpers import create_mock_travel_matrices, create_node_arrays
 
 @pytest.fixture
 def vrptw_ant_setup():
@@ -15,19 +15,20 @@ def vrptw_ant_setup():
     Zaman Pencereleri (VRPTW) ve Hizmet Süresi özelliklerini test etmek için
     gerekli ortamı hazırlar.
     """
-    mock_graph = create_mock_graph()
-    
-    mock_provider = MagicMock()
-    mock_provider.get_travel_info.return_value = (10.0, 2.0) 
-    
-    ant = Ant(mock_graph, start_node=1, capacity=20, distance_provider=mock_provider)
+    dist_matrix, time_matrix = create_mock_travel_matrices(4, distance=10.0, travel_time=2.0)
     
     nodes_info_tw = {
-        1: {'demand': 0, 'time_window': [0, 1440], 'service_time': 0},
-        2: {'demand': 8, 'time_window': [0, 100], 'service_time': 5},
-        3: {'demand': 10, 'time_window': [10, 50], 'service_time': 8},
-        4: {'demand': 6, 'time_window': [0, 10], 'service_time': 3}
+        0: {'demand': 0, 'time_window': [0, 1440], 'service_time': 0},
+        1: {'demand': 8, 'time_window': [0, 100], 'service_time': 5},
+        2: {'demand': 10, 'time_window': [10, 50], 'service_time': 8},
+        3: {'demand': 6, 'time_window': [0, 10], 'service_time': 3}
     }
+    demands, tw_open, tw_close, service_times = create_node_arrays(nodes_info_tw)
+    heuristic_base, eta_beta = build_heuristic_tables(dist_matrix, time_matrix, tw_close, beta=2.0)
+    
+    ant = Ant(start_node=0, capacity=20, dist_matrix=dist_matrix, time_matrix=time_matrix,
+              demands=demands, tw_open=tw_open, tw_close=tw_close, service_times=service_times,
+              heuristic_base=heuristic_base, eta_beta=eta_beta)
     yield ant, nodes_info_tw
 
 def test_ant_selects_visitable_node(vrptw_ant_setup):
@@ -38,10 +39,10 @@ def test_ant_selects_visitable_node(vrptw_ant_setup):
     ant.current_load = 10 
     ant.current_time = 5   
         
-    unvisited = {node_id: info for node_id, info in nodes_info_tw.items() if node_id != 1}
-    next_node = ant._select_next_node({}, unvisited, 1.0, 2.0)
+    unvisited = np.array([False, True, True, True])
+    next_node = ant._select_next_node(np.ones((4, 4)), unvisited, 1.0, 2.0)
     
-    assert next_node in [2, 3, 4]
+    assert next_node in [1, 2, 3]
 
 def test_ant_rejects_node_due_to_time_window(vrptw_ant_setup):
     """
@@ -50,15 +51,15 @@ def test_ant_rejects_node_due_to_time_window(vrptw_ant_setup):
     ant, nodes_info_tw = vrptw_ant_setup
     ant.current_time = 9 
     
-    unvisited = {node_id: info for node_id, info in nodes_info_tw.items() if node_id != 1}
+    unvisited = {node_id: info for node_id, info in nodes_info_tw.items() if node_id != 0}
     candidate_nodes = []
     for node_id, info in unvisited.items():
-        _, travel_time = ant.distance_provider.get_travel_info(ant.current_tour[-1], node_id)
+        travel_time = ant.time_matrix[ant.current_tour[-1], node_id]
         arrival_time = ant.current_time + travel_time
         if arrival_time <= info['time_window'][1]:
             candidate_nodes.append(node_id)
             
-    assert 4 not in candidate_nodes
+    assert 3 not in candidate_nodes
 
 def test_ant_move_to_node_updates_time_correctly(vrptw_ant_setup):
     """
@@ -67,9 +68,9 @@ def test_ant_move_to_node_updates_time_correctly(vrptw_ant_setup):
     ant, nodes_info_tw = vrptw_ant_setup
     ant.current_time = 5 
     
-    ant.move_to_node(3, nodes_info_tw)
+    ant.move_to_node(2)
     
-    assert ant.current_tour == [1, 3]
+    assert ant.current_tour == [0, 2]
     assert ant.total_wait_time == 3
     assert ant.current_time == 18
 
@@ -81,9 +82,9 @@ def test_ant_returns_none_when_no_valid_node(vrptw_ant_setup):
     ant.current_load = 15
     ant.current_time = 95 
 
-    unvisited = {node_id: info for node_id, info in nodes_info_tw.items() if node_id != 1}
+    unvisited = np.array([False, True, True, True])
     
-    next_node = ant._select_next_node({}, unvisited, 1.0, 2.0)
+    next_node = ant._select_next_node(np.ones((4, 4)), unvisited, 1.0, 2.0)
     
     assert next_node is None
 
@@ -95,22 +96,22 @@ def test_ant_rejects_node_due_to_strict_time_window(vrptw_ant_setup):
     ant, nodes_info_tw = vrptw_ant_setup
     ant.current_time = 9.0  # Mevcut zaman: 9. dakika
     
-    unvisited = {node_id: info for node_id, info in nodes_info_tw.items() if node_id != 1}
+    unvisited = {node_id: info for node_id, info in nodes_info_tw.items() if node_id != 0}
     
     candidate_nodes = []
     current_node = ant.current_tour[-1]
     for node_id, info in unvisited.items():
-        if node_id not in ant.visited_nodes:
+        if not ant.visited_mask[node_id]:
             if ant.current_load + info['demand'] <= ant.capacity:
-                _, travel_time = ant.distance_provider.get_travel_info(current_node, node_id)
+                travel_time = ant.time_matrix[current_node, node_id]
                 arrival_time = ant.current_time + travel_time
                 if arrival_time <= info['time_window'][1]: 
                     candidate_nodes.append(node_id)
 
     print(f"Aday düğümler: {candidate_nodes}")
-    assert 4 not in candidate_nodes
+    assert 3 not in candidate_nodes
+    assert 1 in candidate_nodes 
     assert 2 in candidate_nodes 
-    assert 3 in candidate_nodes 
 
 def test_ant_move_to_node_correctly_calculates_wait_time(vrptw_ant_setup):
     """
@@ -120,8 +121,90 @@ def test_ant_move_to_node_correctly_calculates_wait_time(vrptw_ant_setup):
     ant, nodes_info_tw = vrptw_ant_setup
     ant.current_time = 5.0 # Mevcut zaman: 5. dakika
     
-    ant.move_to_node(3, nodes_info_tw)
+    ant.move_to_node(2)
 
     assert ant.total_wait_time == 3.0
     assert ant.current_time == 18.0
-    assert not ant.time_window_violated
\ No newline at end of file
+    assert not ant.time_window_violated
+
+def test_ant_vectorized_selection_never_picks_infeasible_node(vrptw_ant_setup):
+    """
+    Vektörleştirilmiş seçimin, zaman penceresi veya kapasite nedeniyle
+    uygun olmayan durakları hiçbir zaman seçmediğini test eder.
+    """
+    ant, _ = vrptw_ant_setup
+    ant.current_time = 9.0
+    ant.current_load = 11
+
+    unvisited = np.array([False, True, True, True])
+    picks = {ant._select_next_node(np.ones((4, 4)), unvisited, 1.0, 2.0) for _ in range(50)}
+
+    assert picks == {1}
+
+def test_ant_construct_tour_builds_feasible_closed_tour(vrptw_ant_setup):
+    """
+    Derlenmiş tur oluşturma çekirdeğinin depodan başlayıp depoda biten,
+    kapasiteyi aşmayan bir tur ürettiğini ve ziyaret edilen durakları
+    ortak maskeden düşürdüğünü test eder.
+    """
+    ant, _ = vrptw_ant_setup
+    unvisited = np.array([False, True, True, True])
+
+    ant.construct_tour(np.ones((4, 4)), unvisited, 1.0, 2.0)
+
+    assert len(ant.tours) == 1
+    tour = ant.tours[0]
+    assert tour[0] == 0 and tour[-1] == 0
+    visited = tour[1:-1]
+    assert len(visited) >= 1
+    assert not unvisited[visited].any()
+    assert ant.current_load == sum(ant.demands[visited]) <= ant.capacity
+    assert not ant.time_window_violated
+    assert ant.total_distance == 10.0 * (len(tour) - 1)
+
+def test_heuristic_tables_match_direct_formula():
+    """
+    Önceden hesaplanan sezgisel tablonun, bekleme olmadığında doğrudan
+    1 / (mesafe + süre + aciliyet) ** beta formülüyle aynı sonucu verdiğini test eder.
+    """
+    dist_matrix, time_matrix = create_mock_travel_matrices(3, distance=10.0, travel_time=2.0)
+    tw_close = np.array([1440.0, 100.0, 50.0])
+
+    heuristic_base, eta_beta = build_heuristic_tables(dist_matrix, time_matrix, tw_close, beta=2.0)
+
+    expected = (1.0 / (10.0 + 2.0 + 50.0 + 1e-10)) ** 2.0
+    assert heuristic_base[1, 2] == pytest.approx(62.0)
+    assert eta_beta[1, 2] == pytest.approx(expected)
+
+def test_candidate_lists_are_sorted_nearest_first():
+    """
+    En yakın komşu listesinin düğümün kendisini içermediğini ve
+    komşuları mesafeye göre sıraladığını test eder.
+    """
+    dist_matrix = np.array([
+        [0.0, 5.0, 1.0, 3.0],
+        [5.0, 0.0, 2.0, 9.0],
+        [1.0, 2.0, 0.0, 4.0],
+        [3.0, 9.0, 4.0, 0.0],
+    ])
+
+    neighbors = build_candidate_lists(dist_matrix, 2)
+
+    assert neighbors.tolist() == [[2, 3], [2, 0], [0, 1], [0, 2]]
+    assert build_candidate_lists(dist_matrix, 10).shape == (4, 3)
+    assert build_candidate_lists(dist_matrix, 0).shape == (4, 0)
+
+def test_ant_selection_prefers_candidate_list_and_falls_back(vrptw_ant_setup):
+    """
+    Aday listesindeki uygun düğümler varken yalnızca onlardan seçim yapıldığını,
+    hiçbiri uygun değilse tüm düğümlerin tarandığını test eder.
+    """
+    ant, _ = vrptw_ant_setup
+    ant.neighbors = np.array([[2, 1], [0, 2], [0, 1], [0, 1]], dtype=np.int64)
+    unvisited = np.array([False, True, True, True])
+
+    picks = {ant._select_next_node(np.ones((4, 4)), unvisited, 1.0, 2.0) for _ in range(50)}
+    assert picks <= {1, 2}
+
+    unvisited = np.array([False, False, False, True])
+    assert ant._select_next_node(np.ones((4, 4)), unvisited, 1.0, 2.0) == 3
@@ -0,0 +1,42 @@
+import os
+import sys
+import numpy as np
+import pytest
+from sklearn.cluster import DBSCAN
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from src.clustering import dbscan_grid
+
+@pytest.mark.parametrize("eps, min_samples", [(150.0, 5), (400.0, 3), (60.0, 2)])
+def test_dbscan_grid_matches_sklearn(eps, min_samples):
+    """
+    Izgara tabanlı DBSCAN'in çekirdek noktaları ve gürültüyü sklearn ile aynı
+    etiketlediğini test eder. Sınır noktaları birden çok kümeye komşu olabildiği
+    için yalnızca bir çekirdek komşusunun kümesine atanmış olmaları beklenir.
+    """
+    rng = np.random.default_rng(0)
+    centers = rng.uniform(0, 10_000, size=(8, 2))
+    coords = np.vstack([
+        centers[rng.integers(len(centers), size=600)] + rng.normal(scale=300, size=(600, 2)),
+        rng.uniform(0, 10_000, size=(200, 2)),
+    ])
+
+    expected = DBSCAN(eps=eps, min_samples=min_samples).fit(coords)
+    labels = dbscan_grid(coords, eps, min_samples)
+
+    core = np.zeros(len(coords), dtype=bool)
+    core[expected.core_sample_indices_] = True
+    assert np.array_equal(labels[core], expected.labels_[core])
+    assert np.array_equal(labels == -1, expected.labels_ == -1)
+
+    for i in np.flatnonzero(~core & (labels != -1)):
+        distances = np.linalg.norm(coords[core] - coords[i], axis=1)
+        assert labels[i] in set(labels[core][distances <= eps])
+
+def test_dbscan_grid_handles_empty_and_isolated_points():
+    """Boş girdide boş, birbirinden uzak noktalarda yalnızca gürültü döndürülmelidir."""
+    assert dbscan_grid(np.empty((0, 2)), 10.0, 2).size == 0
+    coords = np.array([[0.0, 0.0], [100.0, 0.0], [0.0, 100.0]])
+    assert dbscan_grid(coords, 10.0, 2).tolist() == [-1, -1, -1]
@@ -6,7 +6,7 @@ import networkx as nx
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, project_root)
 
-from src.data_loader import load_graph
+from src.data_loader import load_graph, to_simple_undirected, load_simple_undirected
 
 TEST_PLACE_NAME = "Piedmont, California, USA"
 
@@ -42,7 +42,7 @@ def test_load_graph_invalid_place():
     
     assert G is None
 
-def test_load_graph_network_error(mocker):
+def test_load_graph_network_error(mocker, tmp_path):
     """
     Tests how load_graph handles a network error by mocking the ox.graph_from_place call.
     """
@@ -50,6 +50,58 @@ def test_load_graph_network_error(mocker):
     # bir Exception fırlatacak şekilde "taklit et".
     mocker.patch('osmnx.graph_from_place', side_effect=Exception("Network error"))
     
-    G = load_graph(TEST_PLACE_NAME, verbose=False)
+    G = load_graph(TEST_PLACE_NAME, verbose=False, cache_dir=str(tmp_path))
     
-    assert G is None
\ No newline at end of file
+    assert G is None
+
+def test_load_graph_uses_pickle_cache(mocker, tmp_path):
+    """
+    Tests that the graph is downloaded once and then served from the pickle cache.
+    """
+    graph = nx.MultiDiGraph()
+    graph.add_edge(1, 2, length=10.0)
+    mock_download = mocker.patch('osmnx.graph_from_place', return_value=graph)
+
+    G_first = load_graph(TEST_PLACE_NAME, undirected=False, verbose=False, cache_dir=str(tmp_path))
+    G_second = load_graph(TEST_PLACE_NAME, undirected=True, verbose=False, cache_dir=str(tmp_path))
+
+    assert mock_download.call_count == 1
+    assert G_first.is_directed()
+    assert not G_second.is_directed()
+    assert G_second.has_edge(1, 2)
+
+def test_to_simple_undirected_keeps_shortest_parallel_edge():
+    """
+    Tests that parallel and reverse edges collapse into one undirected edge
+    carrying the minimum length, and that node attributes are preserved.
+    """
+    graph = nx.MultiDiGraph()
+    graph.add_node(1, x=27.8, y=41.1)
+    graph.add_node(2, x=27.9, y=41.2)
+    graph.add_edge(1, 2, length=120.0)
+    graph.add_edge(1, 2, length=90.0)
+    graph.add_edge(2, 1, length=100.0)
+
+    simple = to_simple_undirected(graph)
+
+    assert isinstance(simple, nx.Graph)
+    assert not simple.is_multigraph() and not simple.is_directed()
+    assert simple.number_of_edges() == 1
+    assert simple[1][2]['length'] == 90.0
+    assert simple.nodes[1]['x'] == 27.8
+
+def test_load_simple_undirected_is_cached(mocker, tmp_path):
+    """
+    Tests that the undirected conversion is pickled once and reused afterwards.
+    """
+    graph = nx.MultiDiGraph()
+    graph.add_node(1, x=27.8, y=41.1)
+    graph.add_node(2, x=27.9, y=41.2)
+    graph.add_edge(1, 2, length=10.0)
+    convert_spy = mocker.spy(sys.modules['src.data_loader'], 'to_simple_undirected')
+
+    first = load_simple_undirected(graph, TEST_PLACE_NAME, cache_dir=str(tmp_path))
+    second = load_simple_undirected(graph, TEST_PLACE_NAME, cache_dir=str(tmp_path))
+
+    assert convert_spy.call_count == 1
+    assert second[1][2]['length'] == first[1][2]['length'] == 10.0
@@ -0,0 +1,43 @@
+import os
+import sys
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from src import graph_cache
+from tests.helpers import create_mock_graph
+
+@pytest.fixture(autouse=True)
+def clear_graph_cache():
+    """Her testten önce ve sonra süreç içi graf önbelleğini temizler."""
+    graph_cache._load_graphs.cache_clear()
+    yield
+    graph_cache._load_graphs.cache_clear()
+
+def test_get_graphs_loads_once_per_place(mocker):
+    """
+    Aynı yer için tekrarlanan çağrıların grafı yeniden yüklemediğini test eder.
+    """
+    mock_graph = create_mock_graph()
+    mock_load = mocker.patch('src.graph_cache.load_graph', return_value=mock_graph)
+    mocker.patch('src.graph_cache.load_simple_undirected', return_value=mock_graph)
+
+    first = graph_cache.get_graphs("Test Place")
+    second = graph_cache.get_graphs("Test Place")
+
+    assert first is second
+    assert mock_load.call_count == 1
+
+def test_get_graphs_does_not_cache_failures(mocker):
+    """
+    Başarısız bir yüklemenin önbelleğe alınmadığını, sonraki çağrıda
+    yeniden denendiğini test eder.
+    """
+    mock_graph = create_mock_graph()
+    mock_load = mocker.patch('src.graph_cache.load_graph', side_effect=[None, mock_graph])
+    mocker.patch('src.graph_cache.load_simple_undirected', return_value=mock_graph)
+
+    assert graph_cache.get_graphs("Test Place") is None
+    assert graph_cache.get_graphs("Test Place") == (mock_graph, mock_graph)
+    assert mock_load.call_count == 2
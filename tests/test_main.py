@@ -1,12 +1,13 @@
 import os
 import sys
 import pytest
+import numpy as np
 from unittest.mock import patch, MagicMock
 
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, project_root)
 
-from src.main import main
+from src.main import main, load_config, run_parallel_instances, build_problem, project_to_utm
 from tests.helpers import create_mock_graph
 
 @pytest.fixture
@@ -15,7 +16,7 @@ def setup_main_test(mocker):
     main() fonksiyonunu test etmek için gerekli ortamı hazırlar.
     """
     mock_graph_obj = create_mock_graph()
-    mocker.patch('src.main.load_graph', return_value=mock_graph_obj)
+    mocker.patch('src.main.get_graphs', return_value=(mock_graph_obj, mock_graph_obj))
     
     mock_run_instance = mocker.patch(
         'src.main.run_optimization_instance', 
@@ -63,4 +64,115 @@ def test_main_runs_without_errors_and_calls_plotters(setup_main_test):
 
     mock_plotter.assert_called_once()
     mock_map_object.save.assert_called_once()
-    mock_convergence_plotter.assert_called_once()
\ No newline at end of file
+    mock_convergence_plotter.assert_called_once()
+
+def test_load_config_uses_json_cache_until_yaml_changes(tmp_path, mocker):
+    """
+    load_config'in ilk yüklemede JSON önbelleği yazdığını, sonraki yüklemelerde
+    YAML'ı ayrıştırmadığını ve YAML değişince önbelleği yenilediğini test eder.
+    """
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text("aco:\n  iterations: 5\n")
+
+    assert load_config(str(config_path)) == {'aco': {'iterations': 5}}
+    cache_path = tmp_path / "config.yaml.json"
+    assert cache_path.exists()
+
+    yaml_spy = mocker.spy(sys.modules['src.main'].yaml, 'load')
+    assert load_config(str(config_path)) == {'aco': {'iterations': 5}}
+    yaml_spy.assert_not_called()
+
+    # Aynı zaman damgasıyla yapılan bir düzenleme de önbelleği geçersiz kılar.
+    mtime_ns = config_path.stat().st_mtime_ns
+    config_path.write_text("aco:\n  iterations: 70\n")
+    os.utime(config_path, ns=(mtime_ns, mtime_ns))
+    assert load_config(str(config_path)) == {'aco': {'iterations': 70}}
+    yaml_spy.assert_called_once()
+
+def test_load_config_does_not_cache_non_string_keys(tmp_path, mocker):
+    """
+    JSON'a dönüşünce metne çevrilecek anahtarlar içeren bir yapılandırmanın
+    önbelleğe alınmadığını ve her yüklemede YAML'dan aynen okunduğunu test eder.
+    """
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text("weights:\n  1: 0.5\n")
+
+    assert load_config(str(config_path)) == {'weights': {1: 0.5}}
+    assert not (tmp_path / "config.yaml.json").exists()
+    assert load_config(str(config_path)) == {'weights': {1: 0.5}}
+
+def test_run_parallel_instances_keeps_best_run(mocker):
+    """
+    Bağımsız kolonilerin ana tohumdan türetilmiş (spawn) farklı akışlarla
+    çalıştırıldığını, seyahat matrislerinin havuzdan önce bir kez hazırlandığını
+    ve en düşük maliyetli sonucun döndürüldüğünü test eder.
+    """
+    mock_graph = create_mock_graph()
+    nodes_info = {1: {'demand': 0, 'time_window': [0, 1440], 'service_time': 0}, 2: {'demand': 5}}
+    mocker.patch('src.main.build_problem', return_value=(nodes_info, 1))
+    provider_cls = mocker.patch('src.main.OSRMDistanceProvider')
+    mocker.patch(
+        'src.main.solve_problem',
+        side_effect=lambda config, graph, nodes, start: (
+            [[1, 2, 1]], float(config['aco']['seed'].entropy + config['aco']['seed'].spawn_key[0]), [], 0.0
+        )
+    )
+    config = {'problem': {}, 'aco': {'seed': 10}}
+
+    best_solution, best_cost, _, _, nodes_info_used, start_node_used = run_parallel_instances(
+        config, mock_graph, mock_graph, runs=3
+    )
+
+    assert best_cost == 10.0
+    assert best_solution == [[1, 2, 1]]
+    assert nodes_info_used == nodes_info and start_node_used == 1
+    provider_cls.return_value.get_travel_matrices.assert_called_once_with([1, 2])
+
+def test_build_problem_reads_scenario_file(tmp_path):
+    """
+    'from_scenario' stratejisinin senaryo dosyasındaki depoyu, talepleri ve
+    zaman pencerelerini doğru okuduğunu test eder.
+    """
+    scenario_path = tmp_path / "scenario.json"
+    scenario_path.write_text(
+        '{"depot_node_id": 1, "nodes": ['
+        '{"id": 2, "demand": 5, "time_window_minutes": [60, 120], "service_time_minutes": 10},'
+        '{"id": 4, "demand": 3}]}'
+    )
+    config = {'problem': {'strategy': 'from_scenario', 'scenario_filepath': str(scenario_path),
+                          'default_service_time_minutes': 7}}
+
+    nodes_info, start_node = build_problem(config, create_mock_graph())
+
+    assert start_node == 1
+    assert nodes_info[2] == {'demand': 5, 'time_window': [60, 120], 'service_time': 10}
+    assert nodes_info[4] == {'demand': 3, 'time_window': [0, 1440], 'service_time': 7}
+    assert nodes_info[1]['demand'] == 0
+
+def test_build_problem_random_sampling_is_seeded():
+    """
+    'random' stratejisinin aynı tohumla aynı, birbirinden farklı durakları
+    seçtiğini test eder.
+    """
+    config = {'problem': {'strategy': 'random', 'seed': 3, 'random_stops': {'num_stops': 3}}}
+
+    first_nodes_info, _ = build_problem(config, create_mock_graph())
+    second_nodes_info, _ = build_problem(config, create_mock_graph())
+
+    assert first_nodes_info == second_nodes_info
+    assert len(first_nodes_info) >= 3
+    assert set(first_nodes_info) <= {1, 2, 3, 4}
+
+def test_project_to_utm_gives_metric_distances():
+    """
+    UTM izdüşümünün Çorlu civarında metre cinsinden, yönden bağımsız
+    mesafeler ürettiğini test eder.
+    """
+    coords = np.array([[27.80, 41.15], [27.81, 41.15], [27.80, 41.16]])
+
+    xy = project_to_utm(coords)
+
+    east = np.linalg.norm(xy[1] - xy[0])
+    north = np.linalg.norm(xy[2] - xy[0])
+    assert east == pytest.approx(838, rel=0.01)
+    assert north == pytest.approx(1111, rel=0.01)
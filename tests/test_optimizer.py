@@ -1,12 +1,13 @@
 import os
 import sys
 import pytest
+import numpy as np
 from unittest.mock import MagicMock
 
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, project_root)
 
-from src.optimization import ACOptimizer
+from src.optimization import ACOConfig, ACOptimizer, build_node_arrays
 from tests.helpers import create_mock_graph
 
 @pytest.fixture
@@ -17,6 +18,12 @@ def mock_distance_provider(mocker):
     mock_provider_instance = MagicMock()
     mock_provider_instance.get_travel_info.return_value = (10.0, 2.0)
     mock_provider_instance.get_distance.return_value = 10.0
+
+    def travel_matrices(node_ids):
+        off_diagonal = 1.0 - np.eye(len(node_ids))
+        return 10.0 * off_diagonal, 2.0 * off_diagonal
+
+    mock_provider_instance.get_travel_matrices.side_effect = travel_matrices
     mocker.patch('src.optimization.optimizer.OSRMDistanceProvider', return_value=mock_provider_instance)
 
 @pytest.mark.parametrize("strategy", ["eas", "mmas"])
@@ -101,8 +108,8 @@ def test_optimizer_penalizes_time_window_violation(mock_distance_provider, strat
     ant = optimizer.ants[0]
     ant.reset()
     
-    ant.move_to_node(2, optimizer.nodes_info)
-    ant.move_to_node(4, optimizer.nodes_info)
+    ant.move_to_node(optimizer.node_idx[2])
+    ant.move_to_node(optimizer.node_idx[4])
     ant.finalize_solution()
     
     assert ant.time_window_violated is True
@@ -148,4 +155,349 @@ def test_optimizer_does_not_select_violated_solution_as_best(mock_distance_provi
         if not time_was_violated:
              optimizer.global_best_cost = new_total_cost
              
-    assert optimizer.global_best_cost == valid_cost
\ No newline at end of file
+    assert optimizer.global_best_cost == valid_cost
+
+def test_optimizer_precomputes_travel_matrices_once(mock_distance_provider):
+    """
+    Mesafe/süre matrisinin başlatmada tek bir toplu çağrıyla hesaplandığını
+    ve kompakt indekslerle adreslendiğini test eder.
+    """
+    mock_graph = create_mock_graph()
+    nodes_info_tw = {
+        1: {'demand': 0, 'time_window': [0, 1440], 'service_time': 0},
+        2: {'demand': 10, 'time_window': [0, 100], 'service_time': 5},
+        4: {'demand': 10, 'time_window': [0, 100], 'service_time': 5},
+    }
+
+    optimizer = ACOptimizer(
+        graph=mock_graph,
+        nodes_info=nodes_info_tw,
+        start_node=1,
+        vehicle_fleet=[25],
+        osrm_host="mock_host"
+    )
+
+    assert optimizer.dist_matrix.shape == (3, 3)
+    assert optimizer.dist_matrix.dtype == np.float32
+    assert optimizer.eta_beta.dtype == np.float32
+    assert optimizer.pheromones.dtype == np.float32
+    optimizer.distance_cache.get_travel_matrices.assert_called_once()
+    assert optimizer.dist_matrix[optimizer.node_idx[2], optimizer.node_idx[4]] == 10.0
+    assert optimizer.time_matrix[optimizer.node_idx[4], optimizer.node_idx[2]] == 2.0
+    assert optimizer.dist_matrix[optimizer.start_idx, optimizer.start_idx] == 0.0
+
+
+def test_pheromone_deposit_is_symmetric(mock_distance_provider):
+    """
+    Buharlaşma sonrası toplu uygulanan bırakmaların kenarın iki yönüne de
+    eşit yazıldığını ve diğer kenarların yalnızca buharlaştığını test eder.
+    """
+    mock_graph = create_mock_graph()
+    nodes_info_tw = {
+        1: {'demand': 0, 'time_window': [0, 1440], 'service_time': 0},
+        2: {'demand': 10, 'time_window': [0, 100], 'service_time': 5},
+        4: {'demand': 10, 'time_window': [0, 100], 'service_time': 5},
+    }
+
+    optimizer = ACOptimizer(
+        graph=mock_graph,
+        nodes_info=nodes_info_tw,
+        start_node=1,
+        vehicle_fleet=[25],
+        osrm_host="mock_host"
+    )
+
+    optimizer._evaporate_and_deposit(0.5, [
+        (optimizer._flatten_tours([[0, 1, 0]]), 0.5),
+        (optimizer._flatten_tours([[0, 2, 0]]), 0.25)
+    ])
+
+    assert optimizer.pheromones[0, 1] == optimizer.pheromones[1, 0] == 1.5
+    assert optimizer.pheromones[0, 2] == optimizer.pheromones[2, 0] == 1.0
+    assert optimizer.pheromones[1, 2] == optimizer.pheromones[2, 1] == 0.5
+
+def test_pheromone_update_clamps_to_mmas_limits(mock_distance_provider):
+    """
+    Birleşik güncellemenin buharlaşan değerleri τ_min'e, bırakma alan kenarları
+    ise τ_max'a sıkıştırdığını; bırakma yoksa yalnızca buharlaştırdığını test eder.
+    """
+    mock_graph = create_mock_graph()
+    nodes_info_tw = {
+        1: {'demand': 0, 'time_window': [0, 1440], 'service_time': 0},
+        2: {'demand': 10, 'time_window': [0, 100], 'service_time': 5},
+        4: {'demand': 10, 'time_window': [0, 100], 'service_time': 5},
+    }
+
+    optimizer = ACOptimizer(
+        graph=mock_graph,
+        nodes_info=nodes_info_tw,
+        start_node=1,
+        vehicle_fleet=[25],
+        osrm_host="mock_host"
+    )
+
+    optimizer._evaporate_and_deposit(
+        0.5, [(optimizer._flatten_tours([[0, 1, 0]]), 2.0)], tau_min=0.75, tau_max=2.0
+    )
+
+    assert optimizer.pheromones[0, 1] == optimizer.pheromones[1, 0] == 2.0
+    assert optimizer.pheromones[0, 2] == optimizer.pheromones[1, 2] == 0.75
+
+    optimizer._evaporate_and_deposit(0.5, [])
+    assert optimizer.pheromones[0, 1] == 1.0
+
+@pytest.mark.parametrize("strategy", ["eas", "mmas"])
+def test_pheromones_stay_symmetric_after_run(mock_distance_provider, strategy):
+    """
+    Tam bir çalıştırmadan sonra feromon matrisinin simetrik kaldığını test eder.
+    """
+    mock_graph = create_mock_graph()
+    nodes_info_tw = {
+        1: {'demand': 0, 'time_window': [0, 1440], 'service_time': 0},
+        2: {'demand': 10, 'time_window': [0, 100], 'service_time': 5},
+        4: {'demand': 10, 'time_window': [0, 100], 'service_time': 5},
+    }
+
+    optimizer = ACOptimizer(
+        graph=mock_graph,
+        nodes_info=nodes_info_tw,
+        start_node=1,
+        vehicle_fleet=[25],
+        osrm_host="mock_host",
+        aco_strategy=strategy
+    )
+    optimizer.run(iterations=5)
+
+    assert np.array_equal(optimizer.pheromones, optimizer.pheromones.T)
+    nodes, offsets = optimizer._global_best_flat
+    expected_nodes, expected_offsets = optimizer._flatten_tours(optimizer.global_best_solution)
+    assert np.array_equal(nodes, expected_nodes) and np.array_equal(offsets, expected_offsets)
+
+
+def test_optimizer_builds_parallel_colony_solutions(mock_distance_provider):
+    """
+    Birden fazla filo çözümünün paralel işçi süreçlerde oluşturulabildiğini
+    ve geçerli bir sonuç ürettiğini test eder.
+    """
+    mock_graph = create_mock_graph()
+    nodes_info_tw = {
+        1: {'demand': 0, 'time_window': [0, 1440], 'service_time': 0},
+        2: {'demand': 10, 'time_window': [0, 100], 'service_time': 5},
+        4: {'demand': 10, 'time_window': [0, 100], 'service_time': 5},
+    }
+
+    optimizer = ACOptimizer(
+        graph=mock_graph,
+        nodes_info=nodes_info_tw,
+        start_node=1,
+        vehicle_fleet=[25],
+        osrm_host="mock_host",
+        colony_size=3,
+        n_jobs=2
+    )
+
+    best_solution, best_cost, cost_history = optimizer.run(iterations=2)
+
+    assert best_cost != float('inf')
+    assert sorted(node for tour in best_solution for node in tour[1:-1]) == [2, 4]
+    assert len(cost_history) == 2
+    assert optimizer._shared_blocks == []
+    assert isinstance(optimizer.pheromones, np.ndarray)
+
+def test_thread_backend_matches_process_backend(mock_distance_provider):
+    """
+    İş parçacığı tabanlı paralel oluşturmanın, aynı tohumla süreç tabanlı
+    oluşturmayla aynı sonucu verdiğini test eder.
+    """
+    nodes_info_tw = {
+        1: {'demand': 0, 'time_window': [0, 1440], 'service_time': 0},
+        2: {'demand': 10, 'time_window': [0, 100], 'service_time': 5},
+        3: {'demand': 5, 'time_window': [0, 200], 'service_time': 5},
+        4: {'demand': 10, 'time_window': [0, 100], 'service_time': 5},
+    }
+
+    results = []
+    for backend in ("processes", "threads"):
+        optimizer = ACOptimizer(
+            graph=create_mock_graph(),
+            nodes_info=nodes_info_tw,
+            start_node=1,
+            vehicle_fleet=[15, 15],
+            osrm_host="mock_host",
+            colony_size=3,
+            n_jobs=2,
+            parallel_backend=backend,
+            seed=11
+        )
+        best_solution, best_cost, cost_history = optimizer.run(iterations=3)
+        results.append((best_solution, best_cost, cost_history, optimizer.pheromones.copy()))
+
+    assert results[0][:3] == results[1][:3]
+    assert np.array_equal(results[0][3], results[1][3])
+
+def test_optimizer_is_reproducible_with_seed(mock_distance_provider):
+    """
+    Aynı tohumla başlatılan iki optimizasyonun aynı sonucu ürettiğini test eder.
+    """
+    mock_graph = create_mock_graph()
+    nodes_info_tw = {
+        1: {'demand': 0, 'time_window': [0, 1440], 'service_time': 0},
+        2: {'demand': 10, 'time_window': [0, 100], 'service_time': 5},
+        3: {'demand': 5, 'time_window': [0, 100], 'service_time': 5},
+        4: {'demand': 10, 'time_window': [0, 100], 'service_time': 5},
+    }
+
+    results = []
+    for _ in range(2):
+        optimizer = ACOptimizer(
+            graph=mock_graph,
+            nodes_info=nodes_info_tw,
+            start_node=1,
+            vehicle_fleet=[15, 15],
+            osrm_host="mock_host",
+            seed=42
+        )
+        best_solution, best_cost, _ = optimizer.run(iterations=3)
+        results.append((best_solution, best_cost, optimizer.pheromones.copy()))
+
+    assert results[0][0] == results[1][0]
+    assert results[0][1] == results[1][1]
+    assert np.array_equal(results[0][2], results[1][2])
+
+def test_reset_pheromones_keeps_matrices_and_restarts_search(mock_distance_provider):
+    """
+    reset_pheromones'un matrisleri yeniden hesaplamadan feromonları, en iyi
+    çözümü ve strateji parametrelerini sıfırladığını test eder.
+    """
+    mock_graph = create_mock_graph()
+    nodes_info_tw = {
+        1: {'demand': 0, 'time_window': [0, 1440], 'service_time': 0},
+        2: {'demand': 10, 'time_window': [0, 100], 'service_time': 5},
+        4: {'demand': 10, 'time_window': [0, 100], 'service_time': 5},
+    }
+
+    optimizer = ACOptimizer(
+        graph=mock_graph,
+        nodes_info=nodes_info_tw,
+        start_node=1,
+        vehicle_fleet=[25],
+        osrm_host="mock_host",
+        aco_strategy="mmas",
+        seed=7
+    )
+    first_solution, first_cost, _ = optimizer.run(iterations=3)
+    dist_matrix = optimizer.dist_matrix
+
+    optimizer.reset_pheromones(aco_strategy="eas", eas_elitism_factor=5.0, seed=7)
+
+    assert optimizer.strategy == "eas"
+    assert optimizer.eas_elitism_factor == 5.0
+    assert optimizer.global_best_cost == float('inf')
+    assert not optimizer.mmas_initialized
+    assert np.all(optimizer.pheromones == 1.0)
+    assert optimizer.dist_matrix is dist_matrix
+    optimizer.distance_cache.get_travel_matrices.assert_called_once()
+
+    second_solution, second_cost, _ = optimizer.run(iterations=3)
+    assert second_cost != float('inf')
+
+def test_build_node_arrays_matches_optimizer_layout(mock_distance_provider):
+    """Önceden hazırlanan düğüm dizileri, optimize edicinin kendi oluşturduklarıyla aynı olmalıdır."""
+    mock_graph = create_mock_graph()
+    nodes_info = {
+        1: {'demand': 0, 'time_window': (0, 1000)},
+        2: {'demand': 10, 'time_window': (5, 50), 'service_time': 3},
+        3: {'demand': 15, 'time_window': (20, 80)},
+    }
+    demands, tw_open, tw_close, service_times = build_node_arrays(nodes_info)
+    assert demands.tolist() == [0, 10, 15]
+    assert tw_open.tolist() == [0, 5, 20]
+    assert tw_close.tolist() == [1000, 50, 80]
+    assert service_times.tolist() == [0, 3, 0]
+
+    node_arrays = (demands, tw_open, tw_close, service_times)
+    optimizer = ACOptimizer(
+        graph=mock_graph,
+        nodes_info=nodes_info,
+        start_node=1,
+        vehicle_fleet=[30],
+        osrm_host="mock_host",
+        node_arrays=node_arrays
+    )
+    assert optimizer.demands is demands
+    assert optimizer.service_times is service_times
+
+def test_eas_handles_depot_only_problem(mock_distance_provider):
+    """
+    Yalnızca depodan oluşan bir problemde sıfır maliyetli global en iyi
+    çözümün EAS güncellemesinde sıfıra bölme hatasına yol açmadığını test eder.
+    """
+    optimizer = ACOptimizer(
+        graph=create_mock_graph(),
+        nodes_info={1: {'demand': 0, 'time_window': [0, 1440], 'service_time': 0}},
+        start_node=1,
+        vehicle_fleet=[10],
+        osrm_host="mock_host",
+        aco_strategy="eas"
+    )
+
+    _, best_cost, _ = optimizer.run(iterations=2)
+
+    assert best_cost == 0.0
+
+def test_aco_config_from_dict_and_optimizer_from_config(mock_distance_provider):
+    """
+    'aco' sözlüğünün varsayılanlarla tipli ACOConfig'e ayrıştırıldığını ve
+    optimize edicinin bu yapılandırmadan doğru kurulduğunu test eder.
+    """
+    config = ACOConfig.from_dict({
+        'vehicle_fleet': [25, 15],
+        'iterations': 4,
+        'strategy': 'mmas',
+        'alpha': 1.5,
+        'mmas': {'rho': 0.3},
+    })
+
+    assert config.vehicle_fleet == (25, 15)
+    assert config.beta == 2.0 and config.colony_size == 1 and config.seed is None
+    with pytest.raises(AttributeError):
+        config.alpha = 2.0
+
+    optimizer = ACOptimizer.from_config(
+        create_mock_graph(),
+        {1: {'demand': 0, 'time_window': [0, 1440]}, 2: {'demand': 10, 'time_window': [0, 100]}},
+        1,
+        "mock_host",
+        config
+    )
+
+    assert optimizer.strategy == 'mmas'
+    assert optimizer.alpha == 1.5
+    assert optimizer.mmas_rho == 0.3
+    assert optimizer.vehicle_fleet == [25, 15]
+
+def test_optimizer_stops_early_on_stagnation(mock_distance_provider):
+    """
+    Global en iyi maliyet stagnation_limit iterasyon boyunca iyileşmediğinde
+    çalıştırmanın iterasyon bütçesini bitirmeden durduğunu test eder.
+    """
+    mock_graph = create_mock_graph()
+    nodes_info_tw = {
+        1: {'demand': 0, 'time_window': [0, 1440], 'service_time': 0},
+        2: {'demand': 10, 'time_window': [0, 100], 'service_time': 5},
+        4: {'demand': 10, 'time_window': [0, 100], 'service_time': 5},
+    }
+
+    optimizer = ACOptimizer(
+        graph=mock_graph,
+        nodes_info=nodes_info_tw,
+        start_node=1,
+        vehicle_fleet=[25],
+        osrm_host="mock_host",
+        seed=3,
+        stagnation_limit=3
+    )
+    _, best_cost, cost_history = optimizer.run(iterations=100)
+
+    assert len(cost_history) < 100
+    assert len(cost_history) == cost_history.index(best_cost) + 1 + 3
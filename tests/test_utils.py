@@ -1,30 +1,32 @@
 import os
 import sys
+import gc
 import json
 import pytest
 import networkx as nx
+import numpy as np
+from urllib.parse import urlsplit, parse_qs
+from scipy.sparse.csgraph import dijkstra
 
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, project_root)
 
-from src.utils import DistanceCache
+from src.utils import DistanceCache, OSRMDistanceProvider, update_config_with_args
+from src.utils import _LIVE_DISTANCE_CACHES, _save_caches_at_exit
 from tests.helpers import create_mock_graph
 
 @pytest.fixture
-def cache_setup():
+def cache_setup(tmp_path):
     """
     Bu bir pytest "fixture"ıdır. Her test fonksiyonundan önce çalışır,
     gerekli nesneleri hazırlar ve test bittikten sonra ortalığı temizler.
     Bu, testlerimizin birbirinden etkilenmemesini sağlar.
     """
     mock_graph = create_mock_graph()
-    temp_cache_file = "tests/temp_cache.json"
+    temp_cache_file = str(tmp_path / "temp_cache.npz")
     cache = DistanceCache(mock_graph, cache_filepath=temp_cache_file)
     
     yield cache, temp_cache_file
-    
-    if os.path.exists(temp_cache_file):
-        os.remove(temp_cache_file)
 
 def test_distance_cache_initialization(cache_setup):
     """Tests if the DistanceCache initializes correctly."""
@@ -64,14 +66,82 @@ def test_save_and_load_from_disk(cache_setup):
     assert new_cache.get_distance(1, 2) == 10
     assert new_cache.get_distance(2, 3) == 20
 
+def test_disk_cache_is_stored_as_arrays(cache_setup):
+    """
+    Tests that the disk cache holds the edges and distances as NumPy arrays
+    and that unreachable (inf) entries survive the round trip.
+    """
+    cache, temp_cache_file = cache_setup
+    cache.graph.add_node(99)
+    cache.get_distance(2, 1)
+    cache.get_distance(99, 1)
+    cache.save_to_disk()
+
+    with np.load(temp_cache_file) as saved:
+        assert saved['u'].tolist() == [1, 1]
+        assert saved['v'].tolist() == [2, 99]
+
+    new_cache = DistanceCache(cache.graph, cache_filepath=temp_cache_file)
+    assert new_cache.memory_cache == {(1, 2): 10, (1, 99): float('inf')}
+
+def test_save_skips_rewrite_without_new_distances(cache_setup):
+    """
+    Tests that save_to_disk leaves the file alone when no new distance was
+    computed since the cache was loaded or last saved.
+    """
+    cache, temp_cache_file = cache_setup
+    cache.get_distance(1, 2)
+    cache.save_to_disk()
+    saved_mtime = os.stat(temp_cache_file).st_mtime_ns
+
+    reloaded = DistanceCache(cache.graph, cache_filepath=temp_cache_file)
+    reloaded.get_distance(1, 2)
+    reloaded.save_to_disk()
+    assert os.stat(temp_cache_file).st_mtime_ns == saved_mtime
+
+    reloaded.get_distance(2, 3)
+    reloaded.save_to_disk()
+    assert len(DistanceCache(cache.graph, cache_filepath=temp_cache_file).memory_cache) == 2
+
+def test_exit_hook_saves_only_live_caches(tmp_path):
+    """
+    Tests that the single atexit hook saves caches that are still alive and
+    that a cache drops out of its set once it is garbage collected.
+    """
+    cache_file = str(tmp_path / "exit_cache.npz")
+    cache = DistanceCache(create_mock_graph(), cache_filepath=cache_file)
+    cache.get_distance(1, 2)
+
+    _save_caches_at_exit()
+    assert os.path.exists(cache_file)
+
+    del cache
+    gc.collect()
+    assert all(live.cache_filepath != cache_file for live in _LIVE_DISTANCE_CACHES)
+
+def test_legacy_json_cache_is_migrated_to_npz(tmp_path):
+    """
+    Tests that an old JSON cache next to the .npz path is loaded once and
+    written out in the .npz format on the next save.
+    """
+    with open(tmp_path / "distance_cache.json", 'w') as f:
+        json.dump({"(1, 2)": 10.0, "(2, 4)": 10.0}, f)
+    cache_file = str(tmp_path / "distance_cache.npz")
+
+    cache = DistanceCache(create_mock_graph(), cache_filepath=cache_file)
+    assert cache.memory_cache == {(1, 2): 10.0, (2, 4): 10.0}
+    cache.save_to_disk()
+
+    assert DistanceCache(create_mock_graph(), cache_filepath=cache_file).memory_cache == cache.memory_cache
+
 def test_cache_hit_avoids_recalculation(mocker, cache_setup):
     """
-    Tests that once a distance is cached, the expensive nx.shortest_path_length
+    Tests that once a distance is cached, the expensive nx.bidirectional_dijkstra
     is NOT called again for the same pair of nodes.
     """
     cache, _ = cache_setup
     
-    spy = mocker.spy(nx, 'shortest_path_length')
+    spy = mocker.spy(nx, 'bidirectional_dijkstra')
     
     distance1 = cache.get_distance(1, 4)
     assert distance1 == 14
@@ -112,4 +182,170 @@ def test_cache_key_order_invariance(cache_setup):
     
     assert len(cache.memory_cache) == 1
     assert (1, 2) in cache.memory_cache
-    assert (2, 1) not in cache.memory_cache
\ No newline at end of file
+    assert (2, 1) not in cache.memory_cache
+
+def test_precompute_matches_lazy_distances(mocker, cache_setup):
+    """
+    Tests that precompute runs one Dijkstra per stop and that get_distance
+    then answers every stop pair from the matrix with the same values as the
+    lazy per-pair path.
+    """
+    cache, _ = cache_setup
+    stops = [4, 1, 2, 3]
+    expected = {(u, v): cache.get_distance(u, v) for u in stops for v in stops}
+
+    spy = mocker.patch('src.utils.dijkstra', wraps=dijkstra)
+    pair_spy = mocker.spy(nx, 'bidirectional_dijkstra')
+    matrix = cache.precompute(stops)
+
+    assert spy.call_count == len(stops)
+    assert matrix.shape == (4, 4)
+    assert {(u, v): cache.get_distance(u, v) for u in stops for v in stops} == expected
+    pair_spy.assert_not_called()
+
+def test_parallel_edges_are_flattened_to_shortest(tmp_path):
+    """
+    Tests that parallel edges of a MultiGraph collapse into a single edge
+    with the minimum length before any shortest path is computed.
+    """
+    graph = create_mock_graph()
+    graph.add_edge(1, 2, length=4)
+
+    cache = DistanceCache(graph, cache_filepath=str(tmp_path / "cache.json"))
+
+    assert not cache.graph.is_multigraph()
+    assert cache.graph[1][2]['length'] == 4
+    assert cache.get_distance(1, 2) == 4
+
+def _fake_table_response(url):
+    """Returns an OSRM /table style response whose distances are 1000 * |x_i - x_j|."""
+    parsed = urlsplit(url)
+    coords = [tuple(map(float, pair.split(','))) for pair in parsed.path.rsplit('/', 1)[-1].split(';')]
+    query = parse_qs(parsed.query)
+    sources = [int(k) for k in query['sources'][0].split(';')] if 'sources' in query else range(len(coords))
+    destinations = [int(k) for k in query['destinations'][0].split(';')] if 'destinations' in query else range(len(coords))
+    distances = [[round(1000 * abs(coords[i][0] - coords[j][0]), 6) for j in destinations] for i in sources]
+    response = type('Response', (), {})()
+    response.raise_for_status = lambda: None
+    response.json = lambda: {'code': 'Ok', 'distances': distances, 'durations': [[60 * d for d in row] for row in distances]}
+    return response
+
+@pytest.mark.parametrize("max_table_size", [100, 2])
+def test_travel_matrices_use_table_service(mocker, max_table_size):
+    """
+    Tests that the full matrix comes from /table requests (split into blocks
+    when the node set is larger than max_table_size) and is symmetric.
+    """
+    session = mocker.MagicMock()
+    session.get.side_effect = lambda url, timeout: _fake_table_response(url)
+    mocker.patch('src.utils.requests.Session', return_value=session)
+
+    provider = OSRMDistanceProvider(
+        create_mock_graph(), host="http://osrm", max_table_size=max_table_size, cache_dir=None
+    )
+    dist_matrix, time_matrix = provider.get_travel_matrices([1, 2, 3, 99])
+
+    assert session.get.call_count == (1 if max_table_size == 100 else 6)
+    assert all('/table/' in call.args[0] for call in session.get.call_args_list)
+    assert np.allclose(dist_matrix[:3, :3], [[0, 100, 0], [100, 0, 100], [0, 100, 0]])
+    assert np.allclose(time_matrix[:3, :3], dist_matrix[:3, :3])
+    assert np.all(np.isinf(dist_matrix[3, :3])) and np.all(np.isinf(dist_matrix[:3, 3]))
+    assert dist_matrix[3, 3] == 0.0
+
+def test_travel_matrices_are_cached_on_disk(mocker, tmp_path):
+    """
+    Tests that the matrices of a stop set are written to disk once and reused,
+    reordered, for any ordering of the same stops without querying OSRM again.
+    """
+    session = mocker.MagicMock()
+    session.get.side_effect = lambda url, timeout: _fake_table_response(url)
+    mocker.patch('src.utils.requests.Session', return_value=session)
+
+    provider = OSRMDistanceProvider(create_mock_graph(), host="http://osrm", cache_dir=str(tmp_path))
+    dist_matrix, _ = provider.get_travel_matrices([1, 2, 4])
+    assert session.get.call_count == 1
+    assert len(list(tmp_path.glob("*.npz"))) == 1
+
+    reloaded = OSRMDistanceProvider(create_mock_graph(), host="http://osrm", cache_dir=str(tmp_path))
+    reordered, _ = reloaded.get_travel_matrices([4, 1, 2])
+    assert session.get.call_count == 1
+    assert np.array_equal(reordered, dist_matrix[np.ix_([2, 0, 1], [2, 0, 1])])
+    assert reordered.dtype == np.float32
+
+@pytest.mark.parametrize("contents", [b"", b"PK\x03\x04 truncated"])
+def test_unreadable_matrix_cache_is_queried_again(mocker, tmp_path, contents):
+    """
+    Tests that an empty or truncated matrix cache file does not raise: the
+    matrices are queried from OSRM again and the file is rewritten.
+    """
+    session = mocker.MagicMock()
+    session.get.side_effect = lambda url, timeout: _fake_table_response(url)
+    mocker.patch('src.utils.requests.Session', return_value=session)
+
+    provider = OSRMDistanceProvider(create_mock_graph(), host="http://osrm", cache_dir=str(tmp_path))
+    cache_path = provider._matrix_cache_path(np.array([1, 2, 4], dtype=np.int64))
+    with open(cache_path, 'wb') as f:
+        f.write(contents)
+
+    dist_matrix, _ = provider.get_travel_matrices([1, 2, 4])
+
+    assert session.get.call_count == 1
+    assert dist_matrix[0, 1] == 100.0
+    assert [path.name for path in tmp_path.iterdir()] == [os.path.basename(cache_path)]
+    with np.load(cache_path) as cached:
+        assert np.array_equal(cached['dist'], dist_matrix)
+
+def test_update_config_with_args_overrides_only_given_args():
+    """
+    Tests that CLI arguments that were given overwrite their nested config
+    keys, while missing (None) arguments leave the config untouched.
+    """
+    config = {'problem': {'strategy': 'random', 'num_stops': 10}, 'aco': {'iterations': 50}, 'output': {}}
+    args = type('Args', (), {'num_stops': 25, 'iterations': None, 'output': 'map.html'})()
+
+    updated = update_config_with_args(config, args)
+
+    assert updated is config
+    assert config == {
+        'problem': {'strategy': 'random', 'num_stops': 25},
+        'aco': {'iterations': 50},
+        'output': {'map_filename': 'map.html'},
+    }
+
+def test_precompute_handles_directed_parallel_and_zero_length_edges(tmp_path):
+    """
+    Tests that the CSR search keeps edge directions, uses the shortest of
+    parallel edges and does not drop zero-length edges.
+    """
+    graph = nx.MultiDiGraph()
+    graph.add_edge(1, 2, length=7.0)
+    graph.add_edge(1, 2, length=3.0)
+    graph.add_edge(2, 3, length=0.0)
+    graph.add_edge(3, 1, length=5.0)
+    cache = DistanceCache(graph, cache_filepath=str(tmp_path / "directed.npz"))
+
+    matrix = cache.precompute([1, 2, 3, 99])
+
+    expected = np.array([
+        [0.0, 3.0, 3.0, np.inf],
+        [5.0, 0.0, 0.0, np.inf],
+        [5.0, 8.0, 0.0, np.inf],
+        [np.inf, np.inf, np.inf, np.inf],
+    ])
+    np.testing.assert_array_equal(matrix, expected)
+    assert cache.get_distance(1, 2) == 3.0 and cache.get_distance(2, 1) == 5.0
+
+def test_precompute_ignores_edges_without_length(tmp_path):
+    """
+    Tests that an edge without a 'length' attribute does not break the CSR
+    conversion and is never used by a shortest path.
+    """
+    graph = nx.DiGraph()
+    graph.add_edge(1, 2, length=4.0)
+    graph.add_edge(2, 3)
+    cache = DistanceCache(graph, cache_filepath=str(tmp_path / "no_length.npz"))
+
+    matrix = cache.precompute([1, 2, 3])
+
+    assert matrix[0, 1] == 4.0
+    assert np.isinf(matrix[0, 2]) and np.isinf(matrix[1, 2])